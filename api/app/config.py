@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     APP_NAME: str = "SOL Spot Bot"
     TZ: str = "Asia/Dhaka"
     MODE: str = "paper"
+    BAR_SOURCE: str = "websocket"  # websocket | rest
     
     # Database
     DB_URL: str = "sqlite:///./solspot_bot.db"
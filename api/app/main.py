@@ -2,12 +2,13 @@
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 import logging
 import secrets
 from .config import settings
 from .routes import api, dashboard, reports
-from .telegram_webhook import router as telegram_router
+from .telegram_webhook import router as telegram_router, aclose_http as telegram_aclose_http
 from .db import create_tables
 
 # Configure logging
@@ -26,6 +27,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -114,6 +116,7 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown event"""
     logging.info(f"{settings.APP_NAME} shutting down...")
+    await telegram_aclose_http()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, CheckConstraint, Index
 from sqlalchemy.sql import func
 from .db import Base
 
@@ -64,6 +64,7 @@ class Trade(Base):
         CheckConstraint('entry_price > 0', name='check_positive_entry_price'),
         CheckConstraint('sl > 0', name='check_positive_sl'),
         CheckConstraint('tp1 > 0', name='check_positive_tp1'),
+        Index('ix_trades_symbol_exit_ts', 'symbol', 'exit_ts'),
     )
 
 
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
+from sqlalchemy import func, desc, and_, case
 from typing import List, Optional, Dict
 from datetime import datetime, date
 from . import models
@@ -50,12 +50,15 @@ class AlertRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def insert_alert(self, level: str, message: str) -> models.Alert:
-        """Insert a new alert"""
+    def insert_alert(self, level: str, message: str, commit: bool = True) -> models.Alert:
+        """Insert a new alert (only flushed when commit=False)"""
         alert = models.Alert(level=level, message=message)
         self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
+        if commit:
+            self.db.commit()
+            self.db.refresh(alert)
+        else:
+            self.db.flush()
         return alert
     
     def get_recent_alerts(self, limit: int = 50) -> List[models.Alert]:
@@ -73,14 +76,25 @@ class EquityRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def insert_snapshot(self, equity_usdt: float) -> models.EquitySnapshot:
-        """Insert equity snapshot"""
+    def insert_snapshot(self, equity_usdt: float, commit: bool = True) -> models.EquitySnapshot:
+        """Insert equity snapshot (only flushed when commit=False)"""
         snapshot = models.EquitySnapshot(equity_usdt=equity_usdt)
         self.db.add(snapshot)
-        self.db.commit()
-        self.db.refresh(snapshot)
+        if commit:
+            self.db.commit()
+            self.db.refresh(snapshot)
+        else:
+            self.db.flush()
         return snapshot
     
+    def insert_snapshots(self, equity_values: List[float], commit: bool = True) -> None:
+        """Insert several equity snapshots in one batch"""
+        self.db.add_all([models.EquitySnapshot(equity_usdt=value) for value in equity_values])
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+    
     def latest_equity(self) -> Optional[models.EquitySnapshot]:
         """Get latest equity snapshot"""
         return self.db.query(models.EquitySnapshot).order_by(
@@ -124,8 +138,9 @@ class OrderRepository:
         self.db = db
     
     def insert_order(self, side: str, symbol: str, qty: float, price: float, 
-                    order_type: str, status: str, binance_order_id: str = None) -> models.Order:
-        """Insert a new order"""
+                    order_type: str, status: str, binance_order_id: str = None,
+                    commit: bool = True) -> models.Order:
+        """Insert a new order (only flushed when commit=False)"""
         order = models.Order(
             side=side,
             symbol=symbol,
@@ -136,8 +151,11 @@ class OrderRepository:
             binance_order_id=binance_order_id
         )
         self.db.add(order)
-        self.db.commit()
-        self.db.refresh(order)
+        if commit:
+            self.db.commit()
+            self.db.refresh(order)
+        else:
+            self.db.flush()
         return order
     
     def update_order_status(self, order_id: int, status: str) -> Optional[models.Order]:
@@ -165,8 +183,9 @@ class TradeRepository:
         self.db = db
     
     def open_trade(self, symbol: str, qty: float, entry_price: float, 
-                   sl: float, tp1: float, trail_mult: float = None) -> models.Trade:
-        """Open a new trade"""
+                   sl: float, tp1: float, trail_mult: float = None,
+                   commit: bool = True) -> models.Trade:
+        """Open a new trade (only flushed when commit=False)"""
         trade = models.Trade(
             symbol=symbol,
             qty=qty,
@@ -176,12 +195,16 @@ class TradeRepository:
             trail_mult=trail_mult
         )
         self.db.add(trade)
-        self.db.commit()
-        self.db.refresh(trade)
+        if commit:
+            self.db.commit()
+            self.db.refresh(trade)
+        else:
+            self.db.flush()
         return trade
     
-    def close_trade(self, trade_id: int, exit_price: float, reason_exit: str) -> Optional[models.Trade]:
-        """Close a trade"""
+    def close_trade(self, trade_id: int, exit_price: float, reason_exit: str,
+                    commit: bool = True) -> Optional[models.Trade]:
+        """Close a trade (only flushed when commit=False)"""
         trade = self.db.query(models.Trade).filter(models.Trade.id == trade_id).first()
         if trade and not trade.exit_ts:
             trade.exit_ts = datetime.now()
@@ -195,8 +218,11 @@ class TradeRepository:
                 trade.pnl_usdt = pnl_usdt
                 trade.pnl_pct = pnl_pct
             
-            self.db.commit()
-            self.db.refresh(trade)
+            if commit:
+                self.db.commit()
+                self.db.refresh(trade)
+            else:
+                self.db.flush()
         return trade
     
     def get_open_trades(self) -> List[models.Trade]:
@@ -205,6 +231,20 @@ class TradeRepository:
             models.Trade.exit_ts.is_(None)
         ).order_by(models.Trade.entry_ts).all()
     
+    def get_open_symbols(self) -> List[str]:
+        """Get the symbols of all open trades (no exit_ts)"""
+        rows = self.db.query(models.Trade.symbol).filter(
+            models.Trade.exit_ts.is_(None)
+        ).order_by(models.Trade.entry_ts).all()
+        return [row.symbol for row in rows]
+    
+    def get_open_trade_by_symbol(self, symbol: str) -> Optional[models.Trade]:
+        """Get the oldest open trade for a symbol"""
+        return self.db.query(models.Trade).filter(
+            models.Trade.symbol == symbol,
+            models.Trade.exit_ts.is_(None)
+        ).order_by(models.Trade.entry_ts).first()
+    
     def recent_trades(self, limit: int = 20) -> List[models.Trade]:
         """Get recent trades"""
         return self.db.query(models.Trade).order_by(desc(models.Trade.entry_ts)).limit(limit).all()
@@ -227,6 +267,29 @@ class TradeRepository:
             )
         ).order_by(desc(models.Trade.entry_ts)).all()
 
+    def daily_stats(self, trade_date: date) -> Dict:
+        """Aggregate closed trades entered on a date in a single query"""
+        start_datetime = datetime.combine(trade_date, datetime.min.time())
+        end_datetime = datetime.combine(trade_date, datetime.max.time())
+        
+        total, wins, total_pnl, avg_pnl = self.db.query(
+            func.count(models.Trade.id),
+            func.coalesce(func.sum(case((models.Trade.pnl_usdt > 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(models.Trade.pnl_usdt), 0.0),
+            func.coalesce(func.avg(func.coalesce(models.Trade.pnl_usdt, 0.0)), 0.0)
+        ).filter(
+            models.Trade.entry_ts >= start_datetime,
+            models.Trade.entry_ts <= end_datetime,
+            models.Trade.exit_ts.isnot(None)
+        ).one()
+        
+        return {
+            'total_trades': total,
+            'winning_trades': int(wins),
+            'total_pnl': float(total_pnl),
+            'avg_pnl': float(avg_pnl)
+        }
+
     def get_trade_summary(self) -> Dict:
         """Get trading summary statistics"""
         total_trades = self.db.query(models.Trade).count()
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from telegram import Update
-from telegram.ext import Application
-import json
+import orjson
+import asyncio
 import logging
 import httpx
 import time
 import hmac
 import hashlib
+from typing import Optional
 from .db import get_db
 from .repo import SettingRepository, EquityRepository, TradeRepository, AlertRepository
 from .config import settings
@@ -15,6 +15,55 @@ from .config import settings
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Telegram Bot API endpoints, built once from the configured token
+_TG_BOT_URL = f"https://api.telegram.org/bot{settings.TG_BOT_TOKEN}" if settings.TG_BOT_TOKEN else None
+_TG_SEND_URL = f"{_TG_BOT_URL}/sendMessage" if _TG_BOT_URL else None
+_TG_DELETE_WEBHOOK_URL = f"{_TG_BOT_URL}/deleteWebhook" if _TG_BOT_URL else None
+_TG_GET_UPDATES_URL = f"{_TG_BOT_URL}/getUpdates" if _TG_BOT_URL else None
+_TG_ANSWER_CALLBACK_URL = f"{_TG_BOT_URL}/answerCallbackQuery" if _TG_BOT_URL else None
+_TG_EDIT_MESSAGE_URL = f"{_TG_BOT_URL}/editMessageText" if _TG_BOT_URL else None
+
+_BINANCE_PRICE_URL = "https://api.binance.com/api/v3/ticker/price"
+
+# Shared keep-alive client for Telegram and Binance calls; created on first use
+# and closed by aclose_http() on app shutdown
+_http: Optional[httpx.AsyncClient] = None
+
+# Highest Telegram update_id already fetched by /poll-messages
+_last_update_id = 0
+
+# Static reply for /help and unknown commands
+_HELP_TEXT = """
+🤖 <b>SolSpot Bot Commands</b>
+
+/status - Show bot status, mode, equity, open positions, today P&L
+/pause - Pause the bot
+/resume - Resume the bot
+/report - Show trading report with win rate and P&L
+/help - Show this help message
+""".strip()
+
+
+async def _db(fn, *args, **kwargs):
+    """Run a blocking repository call in a worker thread so it doesn't stall the event loop"""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+def _get_http() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use"""
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient()
+    return _http
+
+
+async def aclose_http() -> None:
+    """Close the shared AsyncClient (called on app shutdown)"""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
 
 async def tg_send(text: str, chat_id: int = None) -> bool:
     """Send message to Telegram using httpx"""
@@ -29,16 +78,15 @@ async def tg_send(text: str, chat_id: int = None) -> bool:
     target_chat_id = chat_id or settings.TG_CHAT_ID
     
     try:
-        url = f"https://api.telegram.org/bot{settings.TG_BOT_TOKEN}/sendMessage"
         data = {
             "chat_id": target_chat_id,
             "text": text,
             "parse_mode": "HTML"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data)
-            response.raise_for_status()
+        client = _get_http()
+        response = await client.post(_TG_SEND_URL, json=data)
+        response.raise_for_status()
             
         logger.info(f"Message sent to chat {target_chat_id}")
         return True
@@ -48,20 +96,37 @@ async def tg_send(text: str, chat_id: int = None) -> bool:
         return False
 
 
+async def tg_post(url: str, data: dict) -> bool:
+    """Call a Telegram Bot API method that needs no response payload"""
+    if not url:
+        logger.error("Telegram bot token not configured")
+        return False
+    
+    try:
+        client = _get_http()
+        response = await client.post(url, json=data)
+        response.raise_for_status()
+        return True
+        
+    except Exception as e:
+        logger.error(f"Telegram API call failed: {e}")
+        return False
+
+
 @router.post("/webhook")
 async def telegram_webhook(request: Request, db: Session = Depends(get_db)):
     """Handle Telegram webhook updates"""
     try:
-        # Parse the incoming update
+        # Parse the incoming update; handlers read the few fields they need
+        # straight from the payload instead of building a full Update object
         body = await request.body()
-        update_data = json.loads(body)
-        update = Update.de_json(update_data, None)
+        update_data = orjson.loads(body)
         
-        # Handle different types of updates
-        if update.message:
-            await handle_message(update.message, db)
-        elif update.callback_query:
-            await handle_callback_query(update.callback_query, db)
+        # Handle different types of updates, other update types are ignored
+        if 'message' in update_data:
+            await handle_message(update_data['message'], db)
+        elif 'callback_query' in update_data:
+            await handle_callback_query(update_data['callback_query'], db)
         
         return {"status": "ok"}
     
@@ -70,20 +135,22 @@ async def telegram_webhook(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-async def handle_message(message, db: Session):
+async def handle_message(message: dict, db: Session):
     """Handle incoming Telegram messages"""
+    text = message.get('text')
+    chat_id = message['chat']['id']
+    
     # Handle commands
-    if message.text and message.text.startswith('/'):
-        await handle_command(message, db)
+    if text and text.startswith('/'):
+        await handle_command(text, chat_id, db)
     else:
         # Handle regular messages
-        await message.reply_text("I'm a trading bot. Use /help to see available commands.")
+        await tg_send("I'm a trading bot. Use /help to see available commands.", chat_id)
 
 
-async def handle_command(message, db: Session):
+async def handle_command(text: str, chat_id: int, db: Session):
     """Handle Telegram bot commands"""
-    command = message.text.split()[0].lower()
-    chat_id = message.chat.id
+    command = text.split()[0].lower()
     
     if command == "/status":
         await handle_status_command(chat_id, db)
@@ -111,70 +178,75 @@ async def handle_status_command(chat_id: int, db: Session):
         trade_repo = TradeRepository(db)
         
         # Get settings
-        mode = setting_repo.get_setting('mode') or settings.MODE
-        is_paused = setting_repo.get_setting('is_paused') == 'true'
+        mode = await _db(setting_repo.get_setting, 'mode') or settings.MODE
+        is_paused = await _db(setting_repo.get_setting, 'is_paused') == 'true'
         
         # Get real-time data from Binance if in LIVE mode
         if mode == 'live' and settings.BINANCE_API_KEY and settings.BINANCE_API_SECRET:
             try:
                 # Get real account balance
-                async with httpx.AsyncClient() as client:
-                    # Get account info
-                    timestamp = int(time.time() * 1000)
-                    query_string = f"timestamp={timestamp}"
-                    signature = hmac.new(
-                        settings.BINANCE_API_SECRET.encode('utf-8'),
-                        query_string.encode('utf-8'),
-                        hashlib.sha256
-                    ).hexdigest()
+                client = _get_http()
+                # Get account info
+                timestamp = int(time.time() * 1000)
+                query_string = f"timestamp={timestamp}"
+                signature = hmac.new(
+                    settings.BINANCE_API_SECRET.encode('utf-8'),
+                    query_string.encode('utf-8'),
+                    hashlib.sha256
+                ).hexdigest()
+                
+                url = f"https://api.binance.com/api/v3/account?{query_string}&signature={signature}"
+                headers = {"X-MBX-APIKEY": settings.BINANCE_API_KEY}
+                
+                # Fetch the account and the SOL price concurrently. A failed
+                # price lookup comes back as an exception object and simply
+                # leaves the SOL price at 0
+                response, price_response = await asyncio.gather(
+                    client.get(url, headers=headers),
+                    client.get(_BINANCE_PRICE_URL, params={"symbol": "SOLUSDT"}, timeout=2.0),
+                    return_exceptions=True
+                )
+                if isinstance(response, Exception):
+                    raise response
+                
+                if response.status_code == 200:
+                    account_data = response.json()
+                    balances = account_data.get('balances', [])
                     
-                    url = f"https://api.binance.com/api/v3/account?{query_string}&signature={signature}"
-                    headers = {"X-MBX-APIKEY": settings.BINANCE_API_KEY}
-                    response = await client.get(url, headers=headers)
+                    # Find USDT balance
+                    usdt_balance = 0
+                    sol_balance = 0
+                    for balance in balances:
+                        if balance['asset'] == 'USDT':
+                            usdt_balance = float(balance['free']) + float(balance['locked'])
+                        elif balance['asset'] == 'SOL':
+                            sol_balance = float(balance['free']) + float(balance['locked'])
                     
-                    if response.status_code == 200:
-                        account_data = response.json()
-                        balances = account_data.get('balances', [])
-                        
-                        # Find USDT balance
-                        usdt_balance = 0
-                        sol_balance = 0
-                        for balance in balances:
-                            if balance['asset'] == 'USDT':
-                                usdt_balance = float(balance['free']) + float(balance['locked'])
-                            elif balance['asset'] == 'SOL':
-                                sol_balance = float(balance['free']) + float(balance['locked'])
-                        
-                        # Calculate total equity (USDT + SOL value)
-                        sol_price = 0
-                        try:
-                            price_response = await client.get("https://api.binance.com/api/v3/ticker/price?symbol=SOLUSDT")
-                            if price_response.status_code == 200:
-                                price_data = price_response.json()
-                                sol_price = float(price_data['price'])
-                        except:
-                            pass
-                        
-                        total_equity = usdt_balance + (sol_balance * sol_price)
-                        equity_text = f"${total_equity:,.2f}"
-                        sol_price_text = f"${sol_price:.2f}"
-                        
-                        # Get open positions from database
-                        open_trades = trade_repo.get_open_trades()
-                        open_pos_count = len(open_trades)
-                        
-                        # Format open positions details
-                        open_positions_text = "None"
-                        if open_trades:
-                            positions = []
-                            for trade in open_trades:
-                                positions.append(f"{trade.symbol} @ ${trade.entry_price:.2f}")
-                            open_positions_text = ", ".join(positions)
-                        
-                        # Calculate today's P&L (simplified - you might want to enhance this)
-                        today_pnl = 0.0  # This would need more complex calculation
-                        
-                        status_text = f"""
+                    # Calculate total equity (USDT + SOL value)
+                    sol_price = 0
+                    if isinstance(price_response, httpx.Response) and price_response.status_code == 200:
+                        sol_price = float(orjson.loads(price_response.content)['price'])
+                    
+                    total_equity = usdt_balance + (sol_balance * sol_price)
+                    equity_text = f"${total_equity:,.2f}"
+                    sol_price_text = f"${sol_price:.2f}"
+                    
+                    # Get open positions from database
+                    open_trades = await _db(trade_repo.get_open_trades)
+                    open_pos_count = len(open_trades)
+                    
+                    # Format open positions details
+                    open_positions_text = "None"
+                    if open_trades:
+                        positions = []
+                        for trade in open_trades:
+                            positions.append(f"{trade.symbol} @ ${trade.entry_price:.2f}")
+                        open_positions_text = ", ".join(positions)
+                    
+                    # Calculate today's P&L (simplified - you might want to enhance this)
+                    today_pnl = 0.0  # This would need more complex calculation
+                    
+                    status_text = f"""
 🤖 <b>Bot Status (LIVE DATA)</b>
 
 📊 <b>Mode:</b> {mode.upper()}
@@ -185,11 +257,11 @@ async def handle_status_command(chat_id: int, db: Session):
 📈 <b>Open Positions:</b> {open_pos_count}
 📋 <b>Positions:</b> {open_positions_text}
 💱 <b>SOL Price:</b> {sol_price_text}
-                        """.strip()
-                        
-                    else:
-                        # Fallback to database data
-                        raise Exception("Failed to get account data")
+                    """.strip()
+                    
+                else:
+                    # Fallback to database data
+                    raise Exception("Failed to get account data")
                         
             except Exception as e:
                 logger.error(f"Error getting live data: {e}")
@@ -220,31 +292,31 @@ async def handle_status_command_fallback(chat_id: int, db: Session):
         trade_repo = TradeRepository(db)
         
         # Get settings
-        mode = setting_repo.get_setting('mode') or settings.MODE
-        is_paused = setting_repo.get_setting('is_paused') == 'true'
+        mode = await _db(setting_repo.get_setting, 'mode') or settings.MODE
+        is_paused = await _db(setting_repo.get_setting, 'is_paused') == 'true'
         
         # Get equity from database
-        latest_equity = equity_repo.latest_equity()
+        latest_equity = await _db(equity_repo.latest_equity)
         equity = latest_equity.equity_usdt if latest_equity else 0
         
         # Get open positions
-        open_trades = trade_repo.get_open_trades()
+        open_trades = await _db(trade_repo.get_open_trades)
         open_pos_count = len(open_trades)
         
         # Get today's P&L
-        today_metrics = equity_repo.today_metrics()
+        today_metrics = await _db(equity_repo.today_metrics)
         today_pnl = today_metrics['daily_pnl']
         
         # Get current SOL price
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get("https://api.binance.com/api/v3/ticker/price?symbol=SOLUSDT")
-                if response.status_code == 200:
-                    price_data = response.json()
-                    sol_price = float(price_data['price'])
-                    sol_price_text = f"${sol_price:.2f}"
-                else:
-                    sol_price_text = "N/A"
+            client = _get_http()
+            response = await client.get("https://api.binance.com/api/v3/ticker/price?symbol=SOLUSDT")
+            if response.status_code == 200:
+                price_data = response.json()
+                sol_price = float(price_data['price'])
+                sol_price_text = f"${sol_price:.2f}"
+            else:
+                sol_price_text = "N/A"
         except Exception as e:
             logger.error(f"Error getting SOL price: {e}")
             sol_price_text = "N/A"
@@ -280,13 +352,13 @@ async def handle_pause_command(chat_id: int, db: Session):
     """Handle /pause command"""
     try:
         setting_repo = SettingRepository(db)
-        setting_repo.set_setting('is_paused', 'true')
+        await _db(setting_repo.set_setting, 'is_paused', 'true')
         
         await tg_send("⏸️ Bot paused", chat_id)
         
         # Log alert
         alert_repo = AlertRepository(db)
-        alert_repo.insert_alert('info', 'Bot paused via Telegram command')
+        await _db(alert_repo.insert_alert, 'info', 'Bot paused via Telegram command')
         
     except Exception as e:
         logger.error(f"Error in pause command: {e}")
@@ -297,13 +369,13 @@ async def handle_resume_command(chat_id: int, db: Session):
     """Handle /resume command"""
     try:
         setting_repo = SettingRepository(db)
-        setting_repo.set_setting('is_paused', 'false')
+        await _db(setting_repo.set_setting, 'is_paused', 'false')
         
         await tg_send("▶️ Bot resumed", chat_id)
         
         # Log alert
         alert_repo = AlertRepository(db)
-        alert_repo.insert_alert('info', 'Bot resumed via Telegram command')
+        await _db(alert_repo.insert_alert, 'info', 'Bot resumed via Telegram command')
         
     except Exception as e:
         logger.error(f"Error in resume command: {e}")
@@ -317,10 +389,10 @@ async def handle_report_command(chat_id: int, db: Session):
         equity_repo = EquityRepository(db)
         
         # Get trade summary
-        trade_summary = trade_repo.get_trade_summary()
+        trade_summary = await _db(trade_repo.get_trade_summary)
         
         # Get today's metrics
-        today_metrics = equity_repo.today_metrics()
+        today_metrics = await _db(equity_repo.today_metrics)
         
         report_text = f"""
 📊 <b>Trading Report</b>
@@ -342,17 +414,7 @@ async def handle_report_command(chat_id: int, db: Session):
 
 async def handle_help_command(chat_id: int):
     """Handle /help command"""
-    help_text = """
-🤖 <b>SolSpot Bot Commands</b>
-
-/status - Show bot status, mode, equity, open positions, today P&L
-/pause - Pause the bot
-/resume - Resume the bot
-/report - Show trading report with win rate and P&L
-/help - Show this help message
-    """.strip()
-    
-    await tg_send(help_text, chat_id)
+    await tg_send(_HELP_TEXT, chat_id)
 
 
 async def handle_unknown_command(chat_id: int):
@@ -360,17 +422,25 @@ async def handle_unknown_command(chat_id: int):
     await handle_help_command(chat_id)
 
 
-async def handle_callback_query(callback_query, db: Session):
+async def handle_callback_query(callback_query: dict, db: Session):
     """Handle callback queries from inline keyboards"""
-    await callback_query.answer()
+    await tg_post(_TG_ANSWER_CALLBACK_URL, {"callback_query_id": callback_query['id']})
+    
+    message = callback_query.get('message') or {}
+    chat_id = message.get('chat', {}).get('id')
+    data = callback_query.get('data')
     
     # Handle different callback data
-    if callback_query.data == "status":
-        await handle_status_command(callback_query.message.chat.id, db)
-    elif callback_query.data == "report":
-        await handle_report_command(callback_query.message.chat.id, db)
+    if data == "status":
+        await handle_status_command(chat_id, db)
+    elif data == "report":
+        await handle_report_command(chat_id, db)
     else:
-        await callback_query.message.edit_text("Unknown callback")
+        await tg_post(_TG_EDIT_MESSAGE_URL, {
+            "chat_id": chat_id,
+            "message_id": message.get('message_id'),
+            "text": "Unknown callback"
+        })
 
 
 @router.get("/test")
@@ -399,14 +469,13 @@ async def set_webhook():
     try:
         # For HTTP servers, we'll use polling instead of webhook
         # First, delete any existing webhook
-        async with httpx.AsyncClient() as client:
-            url = f"https://api.telegram.org/bot{settings.TG_BOT_TOKEN}/deleteWebhook"
-            response = await client.post(url)
-            
-            if response.status_code == 200:
-                return {"status": "success", "message": "Webhook deleted. Use /poll-messages to check for commands."}
-            else:
-                return {"status": "error", "message": f"HTTP error: {response.status_code}"}
+        client = _get_http()
+        response = await client.post(_TG_DELETE_WEBHOOK_URL)
+        
+        if response.status_code == 200:
+            return {"status": "success", "message": "Webhook deleted. Use /poll-messages to check for commands."}
+        else:
+            return {"status": "error", "message": f"HTTP error: {response.status_code}"}
                 
     except Exception as e:
         logger.error(f"Error setting webhook: {e}")
@@ -416,35 +485,46 @@ async def set_webhook():
 @router.get("/poll-messages")
 async def poll_messages():
     """Poll for new messages (alternative to webhook)"""
+    global _last_update_id
+    
     if not settings.TG_BOT_TOKEN:
         raise HTTPException(status_code=400, detail="Telegram bot token not configured")
     
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"https://api.telegram.org/bot{settings.TG_BOT_TOKEN}/getUpdates"
-            response = await client.get(url)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('ok') and result.get('result'):
-                    updates = result['result']
-                    # Process the latest update
-                    if updates:
-                        latest_update = updates[-1]
-                        if 'message' in latest_update and 'text' in latest_update['message']:
-                            message_text = latest_update['message']['text']
-                            chat_id = latest_update['message']['chat']['id']
-                            
-                            # Handle commands
-                            if message_text.startswith('/'):
-                                await handle_command_poll(message_text, chat_id)
-                                return {"status": "success", "message": f"Processed command: {message_text}"}
-                    
-                    return {"status": "success", "message": f"Found {len(updates)} updates"}
-                else:
-                    return {"status": "success", "message": "No new messages"}
+        # Passing offset acknowledges everything up to the last seen update,
+        # so Telegram only returns updates that arrived since the previous poll
+        params = {
+            "offset": _last_update_id + 1,
+            "timeout": 0,
+            "allowed_updates": '["message"]'
+        }
+        
+        client = _get_http()
+        response = await client.get(_TG_GET_UPDATES_URL, params=params)
+        
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            if result.get('ok') and result.get('result'):
+                updates = result['result']
+                _last_update_id = max(update['update_id'] for update in updates)
+                
+                # Process the latest update
+                if updates:
+                    latest_update = updates[-1]
+                    if 'message' in latest_update and 'text' in latest_update['message']:
+                        message_text = latest_update['message']['text']
+                        chat_id = latest_update['message']['chat']['id']
+                        
+                        # Handle commands
+                        if message_text.startswith('/'):
+                            await handle_command_poll(message_text, chat_id)
+                            return {"status": "success", "message": f"Processed command: {message_text}"}
+                
+                return {"status": "success", "message": f"Found {len(updates)} updates"}
             else:
-                return {"status": "error", "message": f"HTTP error: {response.status_code}"}
+                return {"status": "success", "message": "No new messages"}
+        else:
+            return {"status": "error", "message": f"HTTP error: {response.status_code}"}
                 
     except Exception as e:
         logger.error(f"Error polling messages: {e}")
@@ -1,8 +1,11 @@
+import asyncio
 import httpx
 import hmac
 import hashlib
 import time
 import json
+import orjson
+import numpy as np
 import pandas as pd
 import logging
 from typing import Dict, List, Optional, Tuple
@@ -11,7 +14,9 @@ from datetime import datetime
 from binance.spot import Spot
 import sys
 import os
-import uuid
+import itertools
+import queue
+import threading
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,10 +27,42 @@ from api.app.repo import OrderRepository, TradeRepository, EquityRepository, Ale
 
 logger = logging.getLogger(__name__)
 
+# Connection settings for the pooled public REST client
+HTTP_TIMEOUT = httpx.Timeout(10.0)
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# Equity snapshots and fill alerts are written by a background thread in batches
+LOG_BATCH_INTERVAL = 0.1
+LOG_BATCH_SIZE = 100
+
+# Paper balances are held as integer ticks of 1e-8 units so fills never drift
+BALANCE_SCALE = 10 ** 8
+
+
+def _to_ticks(amount: float) -> int:
+    """Convert an asset amount to integer balance ticks"""
+    return int(round(amount * BALANCE_SCALE))
+
+
+def _from_ticks(ticks: int) -> float:
+    """Convert integer balance ticks back to an asset amount"""
+    return ticks / BALANCE_SCALE
+
 
 class SpotClient:
     """Unified spot trading client for paper and live modes"""
     
+    # Symbol filters change at most daily, so one exchangeInfo fetch serves every
+    # symbol for an hour: {symbol: (info, expires_at)}
+    SYMBOL_INFO_TTL = 3600
+    _symbol_info_cache: Dict[str, Tuple[Dict, float]] = {}
+    
+    # Prices are reused within a single strategy tick
+    PRICE_CACHE_TTL = 0.5
+    
+    # Distinguishes clients created in the same process within the same second
+    _instance_counter = itertools.count(1)
+    
     def __init__(self, mode: str = "paper"):
         self.mode = mode
         self.base_url = "https://api.binance.com"
@@ -43,14 +80,20 @@ class SpotClient:
         else:
             self.client = None
         
+        # Keep-alive client for public REST calls so polls reuse open connections
+        self._http = httpx.Client(base_url=self.base_url, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+        self._ahttp = httpx.AsyncClient(base_url=self.base_url, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+        
         # Paper trading state
-        self.paper_balance = {
-            'USDT': 1000.0,
-            'SOL': 0.0
-        }
+        self._usdt_ticks = _to_ticks(1000.0)
+        self._asset_ticks: Dict[str, int] = {'SOL': 0}
         self.paper_orders = []
-        self.order_id_counter = 1
-        self.instance_id = str(uuid.uuid4())[:8]  # Unique instance identifier
+        self._order_counter = itertools.count(1)
+        # Unique instance identifier: pid, start time and per-process sequence
+        self.instance_id = f"{os.getpid():x}{int(time.time()):x}{next(self._instance_counter):x}"
+        
+        # Short-lived price cache: {symbol: (price, fetched_at)}
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
         
         # Database session
         self.db = SessionLocal()
@@ -58,17 +101,105 @@ class SpotClient:
         self.trade_repo = TradeRepository(self.db)
         self.equity_repo = EquityRepository(self.db)
         self.alert_repo = AlertRepository(self.db)
+        
+        # Background writer for equity snapshots and fill alerts; it only holds the
+        # queue, so it never keeps the client alive
+        self._log_q = queue.SimpleQueue()
+        self._log_closed = False
+        self._log_thread = threading.Thread(target=self._run_log_writer, args=(self._log_q,),
+                                            name="spot-log-writer", daemon=True)
+        self._log_thread.start()
     
     def __del__(self):
-        """Cleanup database session"""
+        """Cleanup database session and HTTP connections"""
+        self.close(timeout=0)
+    
+    @staticmethod
+    def _run_log_writer(log_q: queue.SimpleQueue):
+        """Drain queued equity snapshots and alerts, committing each batch once"""
+        db = SessionLocal()
+        equity_repo = EquityRepository(db)
+        alert_repo = AlertRepository(db)
+        running = True
+        
+        try:
+            while running:
+                # Block for the first item, then collect whatever arrives within the batch window
+                batch = [log_q.get()]
+                deadline = time.monotonic() + LOG_BATCH_INTERVAL
+                while len(batch) < LOG_BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(log_q.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                
+                if None in batch:
+                    running = False
+                    batch = [item for item in batch if item is not None]
+                if not batch:
+                    continue
+                
+                try:
+                    equity_values = [value for kind, value in batch if kind == 'equity']
+                    if equity_values:
+                        equity_repo.insert_snapshots(equity_values, commit=False)
+                    for kind, value in batch:
+                        if kind == 'alert':
+                            alert_repo.insert_alert(*value, commit=False)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error writing equity/alert batch: {e}")
+        finally:
+            db.close()
+    
+    def _enqueue_log(self, kind: str, value) -> None:
+        """Hand an equity snapshot or alert to the background writer"""
+        if self._log_closed:
+            logger.warning(f"Log writer is closed, dropping {kind}: {value}")
+            return
+        self._log_q.put((kind, value))
+    
+    def flush_logs(self, timeout: float = 5.0) -> None:
+        """Stop the background writer after it has written everything queued"""
+        if not self._log_closed:
+            self._log_closed = True
+            self._log_q.put(None)
+        self._log_thread.join(timeout)
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush the background writer and close the sync HTTP client and DB session"""
+        if hasattr(self, '_log_thread'):
+            self.flush_logs(timeout)
+        if hasattr(self, '_http'):
+            self._http.close()
         if hasattr(self, 'db'):
             self.db.close()
     
+    async def aclose(self):
+        """Close the async HTTP client"""
+        await self._ahttp.aclose()
+    
+    @property
+    def paper_balance(self) -> Dict[str, float]:
+        """Paper trading balances as floats"""
+        balance = {'USDT': _from_ticks(self._usdt_ticks)}
+        balance.update({asset: _from_ticks(ticks) for asset, ticks in self._asset_ticks.items()})
+        return balance
+    
+    def set_paper_balance(self, asset: str, amount: float) -> None:
+        """Set a paper trading balance"""
+        if asset == 'USDT':
+            self._usdt_ticks = _to_ticks(amount)
+        else:
+            self._asset_ticks[asset] = _to_ticks(amount)
+    
     def _get_unique_order_id(self) -> str:
         """Generate unique order ID"""
-        order_id = f"{self.instance_id}_{self.order_id_counter}"
-        self.order_id_counter += 1
-        return order_id
+        return f"{self.instance_id}_{next(self._order_counter)}"
     
     def get_klines(self, symbol: str, interval: str = '1h', limit: int = 100) -> pd.DataFrame:
         """Get kline/candlestick data"""
@@ -78,81 +209,174 @@ class SpotClient:
                 klines = self.client.klines(symbol, interval, limit=limit)
             else:
                 # Use public API for paper mode
-                url = f"{self.base_url}/api/v3/klines"
                 params = {
                     'symbol': symbol,
                     'interval': interval,
                     'limit': limit
                 }
                 
-                with httpx.Client() as client:
-                    response = client.get(url, params=params)
+                # Stream the body so decompression runs while the payload arrives
+                with self._http.stream("GET", "/api/v3/klines", params=params) as response:
                     response.raise_for_status()
-                    klines = response.json()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
+                    klines = orjson.loads(b"".join(response.iter_bytes()))
             
-            # Convert to float
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Convert timestamp to datetime
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            return df
+            return self._klines_to_frame(klines)
             
         except Exception as e:
             logger.error(f"Error getting klines for {symbol}: {e}")
             return pd.DataFrame()
     
+    @staticmethod
+    def _klines_to_frame(klines: List[List]) -> pd.DataFrame:
+        """Convert raw Binance klines into an OHLCV DataFrame indexed by open time"""
+        if not klines:
+            return pd.DataFrame()
+        
+        # Convert to DataFrame in one go: columns 1-5 are the OHLCV decimal
+        # strings and column 0 is the open time in milliseconds
+        rows = np.array(klines, dtype=object)
+        timestamps = rows[:, 0].astype('datetime64[ms]').astype('datetime64[ns]')
+        
+        # Parse column-major so each OHLCV column is one contiguous float64
+        # buffer that pandas adopts without copying or transposing
+        ohlcv = rows[:, 1:6].T.astype(np.float64, order='C')
+        
+        return pd.DataFrame(
+            ohlcv.T,
+            columns=['open', 'high', 'low', 'close', 'volume'],
+            index=pd.DatetimeIndex(timestamps, name='timestamp'),
+            copy=False
+        )
+    
     def get_symbol_info(self, symbol: str) -> Dict:
         """Get symbol information including stepSize and tickSize"""
+        cached = self._get_cached_symbol_info(symbol)
+        if cached is not None:
+            return cached
+        
         try:
             if self.mode == "live":
                 # Use Binance client for live mode
                 exchange_info = self.client.exchange_info()
             else:
                 # Use public API for paper mode
-                url = f"{self.base_url}/api/v3/exchangeInfo"
-                
-                with httpx.Client() as client:
-                    response = client.get(url)
-                    response.raise_for_status()
-                    exchange_info = response.json()
+                response = self._http.get("/api/v3/exchangeInfo")
+                response.raise_for_status()
+                exchange_info = orjson.loads(response.content)
             
-            # Find symbol info
-            for s in exchange_info['symbols']:
-                if s['symbol'] == symbol:
-                    # Extract filters
-                    step_size = 0.001  # Default
-                    tick_size = 0.01   # Default
-                    
-                    for filter_info in s['filters']:
-                        if filter_info['filterType'] == 'LOT_SIZE':
-                            step_size = float(filter_info['stepSize'])
-                        elif filter_info['filterType'] == 'PRICE_FILTER':
-                            tick_size = float(filter_info['tickSize'])
-                    
-                    return {
-                        'symbol': symbol,
-                        'stepSize': step_size,
-                        'tickSize': tick_size,
-                        'status': s['status']
-                    }
+            return self._cache_exchange_info(exchange_info, symbol)
             
+        except Exception as e:
+            logger.error(f"Error getting symbol info for {symbol}: {e}")
             return {'symbol': symbol, 'stepSize': 0.001, 'tickSize': 0.01, 'status': 'TRADING'}
+    
+    @classmethod
+    def _get_cached_symbol_info(cls, symbol: str) -> Optional[Dict]:
+        """Return cached symbol info if it has not expired"""
+        cached = cls._symbol_info_cache.get(symbol)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        return None
+    
+    @classmethod
+    def _cache_exchange_info(cls, exchange_info: Dict, symbol: str) -> Dict:
+        """Cache filters for every symbol in an exchangeInfo document and return the requested one"""
+        expires_at = time.monotonic() + cls.SYMBOL_INFO_TTL
+        cls._symbol_info_cache.update({
+            s['symbol']: (cls._extract_filters(s), expires_at)
+            for s in exchange_info['symbols']
+        })
+        
+        cached = cls._symbol_info_cache.get(symbol)
+        if cached:
+            return cached[0]
+        return {'symbol': symbol, 'stepSize': 0.001, 'tickSize': 0.01, 'status': 'TRADING'}
+    
+    @staticmethod
+    def _extract_filters(symbol_data: Dict) -> Dict:
+        """Extract stepSize/tickSize/status from one exchangeInfo symbol entry"""
+        step_size = 0.001  # Default
+        tick_size = 0.01   # Default
+        
+        for filter_info in symbol_data['filters']:
+            if filter_info['filterType'] == 'LOT_SIZE':
+                step_size = float(filter_info['stepSize'])
+            elif filter_info['filterType'] == 'PRICE_FILTER':
+                tick_size = float(filter_info['tickSize'])
+        
+        return {
+            'symbol': symbol_data['symbol'],
+            'stepSize': step_size,
+            'tickSize': tick_size,
+            'status': symbol_data['status']
+        }
+    
+    async def aget_klines(self, symbol: str, interval: str = '1h', limit: int = 100,
+                          start_ms: Optional[int] = None) -> pd.DataFrame:
+        """Get kline/candlestick data without blocking the event loop, optionally from start_ms on"""
+        try:
+            # Klines are public market data, so both modes use the REST endpoint
+            params = {
+                'symbol': symbol,
+                'interval': interval,
+                'limit': limit
+            }
+            if start_ms is not None:
+                params['startTime'] = start_ms
+            
+            async with self._ahttp.stream("GET", "/api/v3/klines", params=params) as response:
+                response.raise_for_status()
+                body = b"".join([chunk async for chunk in response.aiter_bytes()])
+            return self._klines_to_frame(orjson.loads(body))
+            
+        except Exception as e:
+            logger.error(f"Error getting klines for {symbol}: {e}")
+            return pd.DataFrame()
+    
+    async def aget_klines_since(self, symbol: str, interval: str, start_ms: int, limit: int = 100) -> pd.DataFrame:
+        """Get only the klines opened at or after start_ms (milliseconds since epoch)"""
+        return await self.aget_klines(symbol, interval, limit=limit, start_ms=start_ms)
+    
+    async def aget_klines_many(self, requests: List[Tuple[str, str]], limit: int = 100) -> List[pd.DataFrame]:
+        """Fetch klines for several (symbol, interval) pairs concurrently"""
+        return await asyncio.gather(
+            *(self.aget_klines(symbol, interval, limit) for symbol, interval in requests)
+        )
+    
+    async def aget_symbol_info(self, symbol: str) -> Dict:
+        """Get symbol information without blocking the event loop"""
+        cached = self._get_cached_symbol_info(symbol)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._ahttp.get("/api/v3/exchangeInfo")
+            response.raise_for_status()
+            return self._cache_exchange_info(orjson.loads(response.content), symbol)
             
         except Exception as e:
             logger.error(f"Error getting symbol info for {symbol}: {e}")
             return {'symbol': symbol, 'stepSize': 0.001, 'tickSize': 0.01, 'status': 'TRADING'}
     
+    async def aget_current_price(self, symbol: str) -> float:
+        """Get current price for a symbol without blocking the event loop"""
+        try:
+            if self.mode == "live":
+                cached = self._get_cached_price(symbol)
+                if cached is not None:
+                    return cached
+                response = await self._ahttp.get("/api/v3/ticker/price", params={'symbol': symbol})
+                response.raise_for_status()
+                price = float(orjson.loads(response.content)['price'])
+                self._price_cache[symbol] = (price, time.monotonic())
+                return price
+            else:
+                # Same simulated price as _get_current_price
+                return 100.0
+        except Exception as e:
+            logger.error(f"Error getting current price for {symbol}: {e}")
+            return 100.0  # Fallback price
+    
     def balances(self) -> Dict[str, float]:
         """Get account balances"""
         if self.mode == "live":
@@ -168,7 +392,7 @@ class SpotClient:
                 return {}
         else:
             # Return paper trading balances
-            return self.paper_balance.copy()
+            return self.paper_balance
     
     def place_limit_buy(self, symbol: str, quantity: float, price: float) -> Dict:
         """Place a limit buy order"""
@@ -203,8 +427,8 @@ class SpotClient:
                 
                 # Check if we have enough USDT
                 cost = quantity * price
-                if cost > self.paper_balance['USDT']:
-                    raise ValueError(f"Insufficient USDT balance. Need {cost}, have {self.paper_balance['USDT']}")
+                if _to_ticks(cost) > self._usdt_ticks:
+                    raise ValueError(f"Insufficient USDT balance. Need {cost}, have {_from_ticks(self._usdt_ticks)}")
                 
                 # Simulate order placement
                 order = {
@@ -226,10 +450,11 @@ class SpotClient:
                     price=price,
                     order_type='LIMIT',
                     status='NEW',
-                    binance_order_id=order_id
+                    binance_order_id=order_id,
+                    commit=False
                 )
                 
-                # Simulate immediate fill for paper trading
+                # Simulate immediate fill; commits the order together with the fill
                 self._simulate_fill(order, 'BUY', quantity, price)
                 
                 return order
@@ -275,8 +500,8 @@ class SpotClient:
                 
                 # Check if we have enough SOL
                 asset = symbol.replace('USDT', '')
-                if quantity > self.paper_balance.get(asset, 0):
-                    raise ValueError(f"Insufficient {asset} balance. Need {quantity}, have {self.paper_balance.get(asset, 0)}")
+                if _to_ticks(quantity) > self._asset_ticks.get(asset, 0):
+                    raise ValueError(f"Insufficient {asset} balance. Need {quantity}, have {_from_ticks(self._asset_ticks.get(asset, 0))}")
                 
                 # Simulate order placement
                 order = {
@@ -298,10 +523,11 @@ class SpotClient:
                     price=price,
                     order_type='LIMIT',
                     status='NEW',
-                    binance_order_id=order_id
+                    binance_order_id=order_id,
+                    commit=False
                 )
                 
-                # Simulate immediate fill for paper trading
+                # Simulate immediate fill; commits the order together with the fill
                 self._simulate_fill(order, 'SELL', quantity, price)
                 
                 return order
@@ -348,8 +574,8 @@ class SpotClient:
                 
                 # Check if we have enough SOL
                 asset = symbol.replace('USDT', '')
-                if quantity > self.paper_balance.get(asset, 0):
-                    raise ValueError(f"Insufficient {asset} balance. Need {quantity}, have {self.paper_balance.get(asset, 0)}")
+                if _to_ticks(quantity) > self._asset_ticks.get(asset, 0):
+                    raise ValueError(f"Insufficient {asset} balance. Need {quantity}, have {_from_ticks(self._asset_ticks.get(asset, 0))}")
                 
                 # Simulate order placement
                 order = {
@@ -371,10 +597,11 @@ class SpotClient:
                     price=current_price,
                     order_type='MARKET',
                     status='FILLED',
-                    binance_order_id=order_id
+                    binance_order_id=order_id,
+                    commit=False
                 )
                 
-                # Simulate immediate fill for paper trading
+                # Simulate immediate fill; commits the order together with the fill
                 self._simulate_fill(order, 'SELL', quantity, current_price)
                 
                 return order
@@ -387,12 +614,24 @@ class SpotClient:
                 pass  # Don't fail if alert logging fails
             raise
     
+    def _get_cached_price(self, symbol: str) -> Optional[float]:
+        """Return a price fetched within the last PRICE_CACHE_TTL seconds"""
+        cached = self._price_cache.get(symbol)
+        if cached and time.monotonic() - cached[1] < self.PRICE_CACHE_TTL:
+            return cached[0]
+        return None
+    
     def _get_current_price(self, symbol: str) -> float:
         """Get current price for a symbol"""
         try:
             if self.mode == "live":
+                cached = self._get_cached_price(symbol)
+                if cached is not None:
+                    return cached
                 ticker = self.client.ticker_price(symbol=symbol)
-                return float(ticker['price'])
+                price = float(ticker['price'])
+                self._price_cache[symbol] = (price, time.monotonic())
+                return price
             else:
                 # For paper trading, use a simulated price
                 # In a real implementation, you'd get this from the klines data
@@ -401,17 +640,68 @@ class SpotClient:
             logger.error(f"Error getting current price for {symbol}: {e}")
             return 100.0  # Fallback price
     
+    def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get current market prices for several symbols with one ticker request
+        
+        Paper mode reads the public ticker too, so holdings are valued at real
+        prices (paper fills still use the simulated _get_current_price).
+        """
+        try:
+            symbols = list(dict.fromkeys(symbols))
+            if not symbols:
+                return {}
+            
+            prices = {}
+            missing = []
+            for symbol in symbols:
+                cached = self._get_cached_price(symbol)
+                if cached is not None:
+                    prices[symbol] = cached
+                else:
+                    missing.append(symbol)
+            
+            if missing:
+                if self.mode == "live":
+                    tickers = self.client.ticker_price(symbols=missing)
+                else:
+                    response = self._http.get("/api/v3/ticker/price",
+                                              params={'symbols': orjson.dumps(missing).decode()})
+                    response.raise_for_status()
+                    tickers = orjson.loads(response.content)
+                now = time.monotonic()
+                for ticker in tickers:
+                    price = float(ticker['price'])
+                    prices[ticker['symbol']] = price
+                    self._price_cache[ticker['symbol']] = (price, now)
+            return prices
+        except Exception as e:
+            logger.error(f"Error getting prices for {symbols}: {e}")
+            return {}
+    
     def _simulate_fill(self, order: Dict, side: str, quantity: float, price: float):
-        """Simulate order fill for paper trading"""
+        """
+        Simulate order fill for paper trading
+        
+        The pending order row and the trade are committed in one transaction,
+        and the paper balance is only updated once that commit succeeds; a
+        failed commit is rolled back and raised. The equity snapshot and fill
+        alert are handed to the background writer.
+        """
         try:
             symbol = order['symbol']
             asset = symbol.replace('USDT', '')
             
+            # A fill moves the market we quote from, so drop any cached price
+            self._price_cache.pop(symbol, None)
+            
+            usdt_ticks = self._usdt_ticks
+            asset_ticks = self._asset_ticks.get(asset, 0)
+            
             if side == 'BUY':
                 # Buy: spend USDT, get SOL
-                cost = quantity * price
-                self.paper_balance['USDT'] -= cost
-                self.paper_balance[asset] = self.paper_balance.get(asset, 0) + quantity
+                usdt_ticks -= _to_ticks(quantity * price)
+                asset_ticks += _to_ticks(quantity)
                 
                 # Log trade
                 self.trade_repo.open_trade(
@@ -419,49 +709,37 @@ class SpotClient:
                     qty=quantity,
                     entry_price=price,
                     sl=price * 0.95,  # 5% stop loss
-                    tp1=price * 1.10   # 10% take profit
+                    tp1=price * 1.10,  # 10% take profit
+                    commit=False
                 )
                 
-                # Update equity
-                total_equity = self.paper_balance['USDT'] + (self.paper_balance.get(asset, 0) * price)
-                self.equity_repo.insert_snapshot(total_equity)
-                
-                logger.info(f"Paper BUY filled: {quantity} {asset} @ ${price}")
-                
             else:  # SELL
                 # Sell: spend SOL, get USDT
-                proceeds = quantity * price
-                self.paper_balance[asset] -= quantity
-                self.paper_balance['USDT'] += proceeds
+                usdt_ticks += _to_ticks(quantity * price)
+                asset_ticks -= _to_ticks(quantity)
                 
                 # Close trade if exists
-                open_trades = self.trade_repo.get_open_trades()
-                for trade in open_trades:
-                    if trade.symbol == symbol:
-                        self.trade_repo.close_trade(trade.id, price, "Market sell")
-                        break
-                
-                # Update equity
-                total_equity = self.paper_balance['USDT'] + (self.paper_balance.get(asset, 0) * price)
-                self.equity_repo.insert_snapshot(total_equity)
-                
-                logger.info(f"Paper SELL filled: {quantity} {asset} @ ${price}")
+                trade = self.trade_repo.get_open_trade_by_symbol(symbol)
+                if trade:
+                    self.trade_repo.close_trade(trade.id, price, "Market sell", commit=False)
             
-            # Log alert
-            try:
-                self.alert_repo.insert_alert(
-                    'info', 
-                    f"Paper {side} order filled: {quantity} {asset} @ ${price:.2f}"
-                )
-            except:
-                pass  # Don't fail if alert logging fails
+            self.db.commit()
+            
+            self._usdt_ticks = usdt_ticks
+            self._asset_ticks[asset] = asset_ticks
+            logger.info(f"Paper {side} filled: {quantity} {asset} @ ${price}")
+            
+            # Update equity and log alert off the order path
+            total_equity = _from_ticks(usdt_ticks) + (_from_ticks(asset_ticks) * price)
+            self._enqueue_log('equity', total_equity)
+            self._enqueue_log('alert', ('info', f"Paper {side} order filled: {quantity} {asset} @ ${price:.2f}"))
             
         except Exception as e:
+            # Nothing was persisted, so the order must not be reported as filled;
+            # the placing method logs the alert and re-raises
+            self.db.rollback()
             logger.error(f"Error simulating fill: {e}")
-            try:
-                self.alert_repo.insert_alert('error', f"Paper fill simulation failed: {str(e)}")
-            except:
-                pass  # Don't fail if alert logging fails
+            raise
     
     def get_account_info(self) -> Dict:
         """Get account information"""
@@ -473,13 +751,28 @@ class SpotClient:
                 return {}
         else:
             # Return paper account info
-            total_equity = sum(self.paper_balance.values())
+            # Format balances and value the holdings at market prices (one ticker request)
+            balances = []
+            total_equity = 0.0
+            holdings = {}
+            for asset, amount in self.paper_balance.items():
+                balances.append({'asset': asset, 'free': f"{amount:.8f}", 'locked': '0.00000000'})
+                if asset == 'USDT':
+                    total_equity += amount
+                elif amount:
+                    holdings[f"{asset}USDT"] = amount
+            
+            prices = self.get_prices(list(holdings)) if holdings else {}
+            for symbol, amount in holdings.items():
+                price = prices.get(symbol)
+                if price is None:
+                    logger.warning(f"No market price for {symbol}, left out of totalEquity")
+                    continue
+                total_equity += amount * price
+            
             return {
                 'accountType': 'SPOT',
-                'balances': [
-                    {'asset': asset, 'free': str(amount), 'locked': '0.00000000'}
-                    for asset, amount in self.paper_balance.items()
-                ],
+                'balances': balances,
                 'totalEquity': total_equity
             }
 
@@ -508,7 +801,7 @@ class PaperTradingAPI:
     
     def __init__(self, initial_balance: float = 20.0):
         self.client = SpotClient(mode="paper")
-        self.client.paper_balance['USDT'] = initial_balance
+        self.client.set_paper_balance('USDT', initial_balance)
     
     def get_klines(self, symbol: str, interval: str = '1h', limit: int = 100) -> List[List]:
         """Get kline/candlestick data"""
@@ -2,10 +2,113 @@ import pandas as pd
 import numpy as np
 import ta
 import logging
+from collections import OrderedDict
 from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+INDICATOR_ARRAY_CACHE_SIZE = 4  # Candle sets whose indicator arrays calculate_all_indicators keeps
+_indicator_array_cache: "OrderedDict[tuple, Tuple[np.ndarray, ...]]" = OrderedDict()
+
+
+def _ewm_array(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """Recursive exponential mean y[i] = alpha*x[i] + (1-alpha)*y[i-1], seeded with x[0]"""
+    return pd.Series(values).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+
+def _ema_array(close: np.ndarray, period: int) -> np.ndarray:
+    """EMA over a float64 array, NaN until `period` values are available"""
+    return _ewm_array(close, 2.0 / (period + 1), period)
+
+
+def _rsi_array(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI over a float64 array using Wilder smoothing of gains and losses"""
+    diff = np.empty_like(close)
+    diff[0] = 0.0
+    np.subtract(close[1:], close[:-1], out=diff[1:])
+    
+    avg_gain = _ewm_array(np.where(diff > 0, diff, 0.0), 1.0 / period, period)
+    avg_loss = _ewm_array(np.where(diff < 0, -diff, 0.0), 1.0 / period, period)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi[avg_loss == 0] = 100.0
+    return rsi
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range over float64 arrays; the first bar uses high - low"""
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    
+    # fmax ignores the missing previous close on the first bar
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _atr_array(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """ATR over float64 arrays: Wilder smoothing of the true range, seeded with its SMA"""
+    true_range = _true_range(high, low, close)
+    
+    atr = np.zeros(len(close))
+    if len(close) >= period:
+        seeded = true_range[period - 1:].copy()
+        seeded[0] = true_range[:period].mean()
+        atr[period - 1:] = _ewm_array(seeded, 1.0 / period, 0)
+    return atr
+
+
+def _all_indicators(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    rsi_period: int = 14, atr_period: int = 14) -> Tuple[np.ndarray, ...]:
+    """
+    Compute EMA20, EMA50, RSI, ATR, ema_diff and ema_diff_pct from OHLC arrays in one go
+    
+    The RSI gain/loss averages and the ATR smoothing share Wilder's alpha, so
+    when the periods match they are run as a single three-column recurrence.
+    
+    Returns:
+        tuple: (ema20, ema50, rsi, atr, ema_diff, ema_diff_pct) float64 arrays
+    """
+    n = len(close)
+    ema20 = _ema_array(close, 20)
+    ema50 = _ema_array(close, 50)
+    
+    if rsi_period != atr_period:
+        rsi = _rsi_array(close, rsi_period)
+        atr = _atr_array(high, low, close, atr_period)
+    else:
+        period = rsi_period
+        prev_close = np.empty_like(close)
+        prev_close[0] = np.nan
+        prev_close[1:] = close[:-1]
+        diff = close - prev_close
+        diff[0] = 0.0
+        
+        # Columns: gains, losses, true range (NaN until the SMA seed of the ATR)
+        wilder = np.full((n, 3), np.nan)
+        np.maximum(diff, 0.0, out=wilder[:, 0])
+        np.maximum(-diff, 0.0, out=wilder[:, 1])
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        if n >= period:
+            wilder[period - 1, 2] = true_range[:period].mean()
+            wilder[period:, 2] = true_range[period:]
+        
+        smoothed = pd.DataFrame(wilder).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy(copy=True)
+        avg_gain, avg_loss = smoothed[:, 0], smoothed[:, 1]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        rsi[avg_loss == 0] = 100.0
+        rsi[:period - 1] = np.nan
+        
+        atr = smoothed[:, 2]
+        atr[:period - 1] = 0.0
+    
+    ema_diff = ema20 - ema50
+    ema_diff_pct = np.abs(ema_diff)
+    np.divide(ema_diff_pct, close, out=ema_diff_pct)
+    return ema20, ema50, rsi, atr, ema_diff, ema_diff_pct
+
 
 def calculate_ema(data: pd.Series, period: int) -> pd.Series:
     """
@@ -19,7 +122,7 @@ def calculate_ema(data: pd.Series, period: int) -> pd.Series:
         pd.Series: EMA values
     """
     try:
-        return ta.trend.ema_indicator(data, window=period)
+        return pd.Series(_ema_array(data.to_numpy(dtype=np.float64), period), index=data.index)
     except Exception as e:
         logger.error(f"Error calculating EMA({period}): {e}")
         return pd.Series([np.nan] * len(data), index=data.index)
@@ -37,7 +140,7 @@ def calculate_rsi(data: pd.Series, period: int = 14) -> pd.Series:
         pd.Series: RSI values (0-100)
     """
     try:
-        return ta.momentum.rsi(data, window=period)
+        return pd.Series(_rsi_array(data.to_numpy(dtype=np.float64), period), index=data.index)
     except Exception as e:
         logger.error(f"Error calculating RSI({period}): {e}")
         return pd.Series([np.nan] * len(data), index=data.index)
@@ -57,12 +160,31 @@ def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int
         pd.Series: ATR values
     """
     try:
-        return ta.volatility.average_true_range(high, low, close, window=period)
+        atr = _atr_array(
+            high.to_numpy(dtype=np.float64),
+            low.to_numpy(dtype=np.float64),
+            close.to_numpy(dtype=np.float64),
+            period
+        )
+        return pd.Series(atr, index=close.index)
     except Exception as e:
         logger.error(f"Error calculating ATR({period}): {e}")
         return pd.Series([np.nan] * len(close), index=close.index)
 
 
+def _candle_set_key(index: pd.Index, close: np.ndarray, high: np.ndarray, low: np.ndarray) -> Optional[tuple]:
+    """
+    Cache key for a candle set, or None for an empty one
+    
+    OHLCV frames are append-only, so the first/last bar, the length and the last
+    bar's close/high/low identify the set; a forming or patched last bar whose
+    high or low moved (which changes ATR) gets a new key even if its close did not.
+    """
+    if not len(index):
+        return None
+    return (index[0], index[-1], len(index), close[-1], high[-1], low[-1])
+
+
 def calculate_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate all technical indicators for a DataFrame
@@ -74,22 +196,34 @@ def calculate_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: Original data with added indicator columns
     """
     try:
-        # Make a copy to avoid modifying original
-        result_df = df.copy()
-        
-        # Calculate EMAs
-        result_df['ema20'] = calculate_ema(result_df['close'], 20)
-        result_df['ema50'] = calculate_ema(result_df['close'], 50)
-        
-        # Calculate RSI
-        result_df['rsi'] = calculate_rsi(result_df['close'], 14)
+        # Read each OHLC column once and compute every indicator from the arrays
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
         
-        # Calculate ATR
-        result_df['atr'] = calculate_atr(result_df['high'], result_df['low'], result_df['close'], 14)
+        # A repeat on the same candle set reuses the arrays
+        key = _candle_set_key(df.index, close, high, low)
+        arrays = _indicator_array_cache.get(key)
+        if arrays is None:
+            arrays = _all_indicators(close, high, low)
+            if key is not None:
+                _indicator_array_cache[key] = arrays
+                if len(_indicator_array_cache) > INDICATOR_ARRAY_CACHE_SIZE:
+                    _indicator_array_cache.popitem(last=False)
+        else:
+            _indicator_array_cache.move_to_end(key)
+        # Columns get their own copies so callers can't modify the cached arrays
+        ema20, ema50, rsi, atr, ema_diff, ema_diff_pct = (a.copy() for a in arrays)
         
-        # Calculate additional derived indicators
-        result_df['ema_diff'] = result_df['ema20'] - result_df['ema50']
-        result_df['ema_diff_pct'] = abs(result_df['ema_diff']) / result_df['close']
+        # assign returns a new frame without deep-copying the OHLCV columns
+        result_df = df.assign(
+            ema20=ema20,
+            ema50=ema50,
+            rsi=rsi,
+            atr=atr,
+            ema_diff=ema_diff,
+            ema_diff_pct=ema_diff_pct
+        )
         
         logger.info(f"Calculated indicators for {len(result_df)} data points")
         return result_df
@@ -112,7 +246,7 @@ def is_valid_data(df: pd.DataFrame) -> bool:
     required_columns = ['open', 'high', 'low', 'close', 'volume']
     
     # Check if all required columns exist
-    if not all(col in df.columns for col in required_columns):
+    if not set(required_columns).issubset(df.columns):
         logger.error(f"Missing required columns. Need: {required_columns}")
         return False
     
@@ -127,20 +261,201 @@ def is_valid_data(df: pd.DataFrame) -> bool:
         return False
     
     # Check for NaN values in required columns
-    for col in required_columns:
-        if df[col].isna().all():
-            logger.error(f"All values in {col} are NaN")
-            return False
+    nan_cols = df[required_columns].isna().all(axis=0)
+    if nan_cols.any():
+        logger.error(f"All values in {', '.join(nan_cols.index[nan_cols])} are NaN")
+        return False
     
     return True
 
 
-def get_latest_indicators(df: pd.DataFrame) -> dict:
+LATEST_INDICATOR_COLUMNS = ('close', 'ema20', 'ema50', 'rsi', 'atr', 'ema_diff_pct')
+
+
+def _bar_close_high_low(df: pd.DataFrame, i: int) -> Tuple[float, float, float]:
+    """Close, high and low of row i as floats, read from the column arrays without building a row Series"""
+    return float(df['close'].values[i]), float(df['high'].values[i]), float(df['low'].values[i])
+
+
+class IndicatorState:
+    """
+    Running EMA20/EMA50/RSI/ATR recurrences for O(1) updates per bar
+    
+    Produces the same values as calculate_all_indicators on the same history.
+    Closed bars are committed with update(); peek() evaluates a bar (e.g. the
+    one still forming) without committing it.
+    """
+    
+    def __init__(self, rsi_period: int = 14, atr_period: int = 14):
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget all history"""
+        self.count = 0
+        self.last_index = None
+        self.prev_close = None
+        self.ema20 = 0.0
+        self.ema50 = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.atr = 0.0
+        self.tr_sum = 0.0  # Sum of true ranges until the ATR seed is available
+    
+    def seed(self, df: pd.DataFrame) -> None:
+        """
+        Rebuild the state from a block of history
+        
+        Args:
+            df: DataFrame with 'high', 'low', 'close' columns
+        """
+        self.reset()
+        if len(df) == 0:
+            return
+        
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        
+        diff = np.diff(close, prepend=close[0])
+        self.ema20 = _ewm_array(close, 2.0 / 21, 0)[-1]
+        self.ema50 = _ewm_array(close, 2.0 / 51, 0)[-1]
+        self.avg_gain = _ewm_array(np.maximum(diff, 0.0), 1.0 / self.rsi_period, 0)[-1]
+        self.avg_loss = _ewm_array(np.maximum(-diff, 0.0), 1.0 / self.rsi_period, 0)[-1]
+        
+        if len(close) >= self.atr_period:
+            self.atr = _atr_array(high, low, close, self.atr_period)[-1]
+        else:
+            self.tr_sum = _true_range(high, low, close).sum()
+        
+        self.count = len(close)
+        self.prev_close = close[-1]
+        self.last_index = df.index[-1]
+    
+    def _step(self, close: float, high: float, low: float) -> Tuple[float, ...]:
+        """Advance every recurrence by one bar without storing the result"""
+        if self.count == 0:
+            ema20 = ema50 = close
+            avg_gain = avg_loss = 0.0
+            true_range = high - low
+        else:
+            diff = close - self.prev_close
+            ema20 = self.ema20 + (close - self.ema20) * 2.0 / 21
+            ema50 = self.ema50 + (close - self.ema50) * 2.0 / 51
+            avg_gain = self.avg_gain + (max(diff, 0.0) - self.avg_gain) / self.rsi_period
+            avg_loss = self.avg_loss + (max(-diff, 0.0) - self.avg_loss) / self.rsi_period
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        
+        count = self.count + 1
+        atr = self.atr
+        tr_sum = self.tr_sum
+        if count < self.atr_period:
+            tr_sum += true_range
+        elif count == self.atr_period:
+            atr = (tr_sum + true_range) / self.atr_period
+        else:
+            atr += (true_range - atr) / self.atr_period
+        
+        return count, ema20, ema50, avg_gain, avg_loss, atr, tr_sum
+    
+    def _values(self, step: Tuple[float, ...], close: float) -> dict:
+        """Indicator values for a step, with the same warm-up NaNs as the batch path"""
+        count, ema20, ema50, avg_gain, avg_loss, atr, _ = step
+        ema20 = ema20 if count >= 20 else np.nan
+        ema50 = ema50 if count >= 50 else np.nan
+        
+        if count < self.rsi_period:
+            rsi = np.nan
+        elif avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        
+        return {
+            'close': close,
+            'ema20': ema20,
+            'ema50': ema50,
+            'rsi': rsi,
+            'atr': atr,
+            'ema_diff_pct': abs(ema20 - ema50) / close
+        }
+    
+    def update(self, close: float, high: float, low: float, index=None) -> dict:
+        """
+        Commit a closed bar and return the indicator values at that bar
+        
+        Args:
+            close: Bar close
+            high: Bar high
+            low: Bar low
+            index: Optional bar label (e.g. open time), used by sync()
+        
+        Returns:
+            dict: Indicator values at this bar
+        """
+        step = self._step(close, high, low)
+        (self.count, self.ema20, self.ema50, self.avg_gain,
+         self.avg_loss, self.atr, self.tr_sum) = step
+        self.prev_close = close
+        self.last_index = index
+        return self._values(step, close)
+    
+    def peek(self, close: float, high: float, low: float) -> dict:
+        """Return the indicator values a bar would produce, without committing it"""
+        return self._values(self._step(close, high, low), close)
+    
+    def advance(self, df: pd.DataFrame) -> dict:
+        """
+        Commit the newest bar of df and return its indicator values
+        
+        O(1) when the state already holds every bar but the newest; otherwise
+        it reseeds from the history first.
+        
+        Args:
+            df: DataFrame of closed bars with 'high', 'low', 'close' columns
+        
+        Returns:
+            dict: Indicator values at the newest bar
+        """
+        index = df.index
+        if not (len(df) >= 2 and self.last_index is not None and index[-2] == self.last_index):
+            self.seed(df.iloc[:-1])
+        
+        return self.update(*_bar_close_high_low(df, -1), index[-1])
+    
+    def sync(self, df: pd.DataFrame) -> dict:
+        """
+        Commit every bar of df except the newest, then peek at the newest
+        
+        When the state already holds all but the last one or two bars this is
+        O(1); otherwise it reseeds from the history.
+        
+        Args:
+            df: DataFrame with 'high', 'low', 'close' columns
+        
+        Returns:
+            dict: Indicator values at the newest bar
+        """
+        index = df.index
+        if len(df) >= 2 and self.last_index is not None and index[-2] == self.last_index:
+            pass
+        elif len(df) >= 3 and self.last_index is not None and index[-3] == self.last_index:
+            self.update(*_bar_close_high_low(df, -2), index[-2])
+        else:
+            self.seed(df.iloc[:-1])
+        
+        return self.peek(*_bar_close_high_low(df, -1))
+
+
+def get_latest_indicators(df: pd.DataFrame, state: Optional[IndicatorState] = None) -> dict:
     """
     Get the latest indicator values from a DataFrame
     
     Args:
-        df: DataFrame with calculated indicators
+        df: DataFrame with OHLCV data, optionally with calculated indicators
+        state: Optional IndicatorState kept across calls, so each new bar
+            costs O(1) instead of a full recomputation
     
     Returns:
         dict: Latest indicator values
@@ -149,21 +464,14 @@ def get_latest_indicators(df: pd.DataFrame) -> dict:
         if not is_valid_data(df):
             return {}
         
-        # Calculate indicators if not already present
+        # Reuse already calculated indicator columns
         if 'ema20' not in df.columns:
-            df = calculate_all_indicators(df)
-        
-        # Get the latest values
-        latest = df.iloc[-1]
+            if state is None:
+                state = IndicatorState()
+            return state.sync(df)
         
-        return {
-            'close': latest['close'],
-            'ema20': latest['ema20'],
-            'ema50': latest['ema50'],
-            'rsi': latest['rsi'],
-            'atr': latest['atr'],
-            'ema_diff_pct': latest['ema_diff_pct']
-        }
+        # Get the latest values straight from the column arrays
+        return {col: float(df[col].values[-1]) for col in LATEST_INDICATOR_COLUMNS}
         
     except Exception as e:
         logger.error(f"Error getting latest indicators: {e}")
@@ -1,13 +1,21 @@
 import asyncio
+import functools
+import heapq
+import importlib
+import itertools
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import sys
 import os
 import pytz
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+import httpx
+import orjson
+import numpy as np
+import pandas as pd
+from binance.websocket.spot.websocket_stream import SpotWebsocketStreamClient
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,15 +24,136 @@ from api.app.config import settings
 from api.app.db import SessionLocal
 from api.app.repo import TradeRepository, SettingRepository, EquityRepository, AlertRepository
 from .exchange import SpotClient
-from .indicators import calculate_all_indicators
-from .signal import generate_signal
+from .indicators import calculate_all_indicators, IndicatorState
+from .signal import generate_signal_from_indicators, SignalResult
 from .risk import RiskManager
 
 logger = logging.getLogger(__name__)
 
+# Kline stream settings
+BINANCE_WS_URL = "wss://stream.binance.com:9443"
+KLINE_BUFFER_SIZE = 100
+STREAM_STALE_TIMEOUT = 120  # Seconds without any stream message before reconnecting
+STREAM_MAX_BACKOFF = 60
+BAR_CLOSE_DELAY = 2  # Seconds after a bar boundary before the REST source fetches it
+
+# Settings such as is_paused change rarely, so reads are reused for a short time
+SETTING_CACHE_TTL = 2.0
+
+def next_daily_time(now: datetime, hour: int, minute: int) -> datetime:
+    """Next occurrence of hour:minute in now's timezone, strictly after now"""
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return now.tzinfo.normalize(run_at) if hasattr(now.tzinfo, 'normalize') else run_at
+
+
+def next_aligned_time(now: datetime, step: timedelta) -> datetime:
+    """Next multiple of step after local midnight, strictly after now (like cron '*/n')"""
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    run_at = midnight + ((now - midnight) // step + 1) * step
+    return now.tzinfo.normalize(run_at) if hasattr(now.tzinfo, 'normalize') else run_at
+
+
+def interval_seconds(interval: str) -> int:
+    """Length of a Binance kline interval such as '15m' or '4h' in seconds"""
+    units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    return int(interval[:-1]) * units[interval[-1]]
+
+
 class TradingBot:
     """Main trading bot implementation"""
 
+    # Telegram message templates, filled with str.format_map
+    TPL_KILL_SWITCH = """
+🚨 <b>KILL SWITCH ACTIVATED</b>
+⚠️ {switch_type}
+
+📊 <b>Current Status</b>
+• Equity: ${current_equity:,.2f}
+• Peak Equity: ${peak_equity:,.2f}
+• Today's P&L: ${daily_pnl:,.2f}
+
+🔍 <b>Reason</b>
+{reason}
+
+🛑 <b>Action Taken</b>
+• Trading PAUSED
+• Manual intervention required
+• Use /resume to restart (after investigation)
+
+⏰ {now:%Y-%m-%d %H:%M} {tz}
+""".strip()
+
+    TPL_DAILY_REPORT = """
+📊 <b>Daily Trading Report</b>
+📅 {now:%Y-%m-%d}
+
+💰 <b>Equity</b>
+• Current: ${current_equity:,.2f}
+• Peak: ${peak_equity:,.2f}
+• Drawdown: {drawdown_pct:.1f}%
+• Today's P&L: ${daily_pnl:,.2f}
+
+📈 <b>Trading Summary</b>
+• Total Trades: {total_trades}
+• Win Rate: {win_rate:.1f}%
+• Total P&L: ${total_pnl:,.2f}
+• Avg P&L: ${avg_pnl:,.2f}
+
+🔄 <b>Open Positions</b>
+• Count: {open_positions}
+• Symbols: {symbols}
+
+⚙️ <b>Bot Status</b>
+• Mode: {mode}
+• Paused: {paused}
+• API Failures: {api_failures}/{max_api_failures}
+""".strip()
+
+    TPL_HEARTBEAT = """
+💓 <b>Bot Heartbeat</b>
+🕐 {now:%Y-%m-%d %H:%M} {tz}
+
+⚙️ <b>Status</b>
+• Mode: {mode}
+• Paused: {paused}
+• Running: {running}
+
+💰 <b>Equity</b>
+• Current: ${current_equity:,.2f}
+• Peak: ${peak_equity:,.2f}
+• Drawdown: {drawdown_pct:.1f}%
+
+📊 <b>Positions</b>
+• Open: {open_positions}
+• Symbols: {symbols}
+
+🔄 <b>Last Trade</b>
+{last_trade}
+
+🔧 <b>Health</b>
+• API Failures: {api_failures}/{max_api_failures}
+""".strip()
+
+    TPL_LAST_TRADE = "• {symbol} - {entry_ts:%H:%M} - ${entry_price:.2f}"
+
+    TPL_TRADE_CLOSED = """
+🔴 <b>Trade Closed</b>
+📊 {symbol}
+💰 P&L: ${pnl_usdt:,.2f} ({pnl_pct:+.2f}%)
+📈 Exit: ${exit_price:.2f}
+🎯 Reason: {reason}
+""".strip()
+
+    TPL_TRADE_ENTRY = """
+🟢 <b>Trade Entry</b>
+📊 {qty} {symbol}
+💰 Price: ${entry_price:.2f}
+🛑 SL: ${sl:.2f}
+🎯 TP1: ${tp1:.2f}
+""".strip()
+
     def __init__(self, symbol: str = None, interval: str = None):
         # Import trading configuration
         try:
@@ -60,6 +189,30 @@ class TradingBot:
         self.setting_repo = SettingRepository(self.db)
         self.equity_repo = EquityRepository(self.db)
         self.alert_repo = AlertRepository(self.db)
+        
+        # Async jobs run their queries on a dedicated DB thread with its own session,
+        # so database round-trips never block the event loop
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-db")
+        self._job_db = SessionLocal()
+        self._job_trade_repo = TradeRepository(self._job_db)
+        self._job_setting_repo = SettingRepository(self._job_db)
+        self._job_equity_repo = EquityRepository(self._job_db)
+        self._job_alert_repo = AlertRepository(self._job_db)
+        
+        # Keep-alive client for Telegram so each notification reuses the connection
+        self._http = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_keepalive_connections=4))
+        self._tg_url = (
+            f"https://api.telegram.org/bot{settings.TG_BOT_TOKEN}/sendMessage"
+            if settings.TG_BOT_TOKEN else None
+        )
+        
+        # Short-lived settings cache: {key: (fetched_at, value)}
+        self._setting_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        
+        # Kill switch tracking; the peak survives restarts via the settings table
+        self.peak_equity = self._load_peak_equity()
+        self.api_failure_count = 0
+        self._killswitch_task: Optional[asyncio.Task] = None
 
         # Initialize risk manager with config values, but will update with real equity
         self.risk_manager = RiskManager(
@@ -80,85 +233,138 @@ class TradingBot:
             except Exception as e:
                 logger.error(f"Failed to initialize with real equity: {e}")
 
-        self.last_bar_time = None
+        self._last_bar_ns = 0  # Open time of the last processed bar, ns since epoch
         self.current_bar = 0
+        self.bars = None  # Rolling buffer of closed klines fed by the websocket stream
+        self.ind_state = IndicatorState()  # Running indicators over self.bars
+        self.bar_queue: asyncio.Queue = asyncio.Queue(maxsize=2)  # Closed-bar frames from the bar source
+        self._bar_source_task = None
         self.is_running = False
         
-        # Kill switch tracking
-        self.peak_equity = self.initial_equity
-        self.api_failure_count = 0
-        
         # Initialize scheduler
-        self.scheduler = AsyncIOScheduler(timezone=self.tz)
+        self._job_tz = pytz.timezone(self.tz)
+        self._jobs = []  # Heap of (next_run_ts, seq, name, coro_factory, next_run)
+        self._job_seq = itertools.count()
+        self._job_tasks = set()
+        self._scheduler_task = None
         self.setup_scheduler()
+        self._closed = False
 
-    def __del__(self):
-        if hasattr(self, 'db'):
-            self.db.close()
-        if hasattr(self, 'scheduler'):
-            self.scheduler.shutdown()
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop background tasks and release HTTP clients, the DB thread and DB sessions"""
+        if self._closed:
+            return
+        self._closed = True
+        self.is_running = False
+        
+        # Scheduled jobs still running use the DB thread and its session below,
+        # so they are cancelled and awaited before either is shut down
+        tasks = [task for task in (self._bar_source_task, self._scheduler_task, *self._job_tasks)
+                 if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        await self._http.aclose()
+        await self.exchange.aclose()
+        # Writes queued fill snapshots/alerts, then closes the exchange's sync client and session
+        await asyncio.to_thread(self.exchange.close)
+        
+        # Let in-flight repository calls finish before closing their session
+        await asyncio.to_thread(self._db_executor.shutdown)
+        self._job_db.close()
+        self.db.close()
 
     def setup_scheduler(self):
         """Setup scheduled tasks"""
         try:
             # Daily report at 23:59 Asia/Dhaka
-            self.scheduler.add_job(
-                self.send_daily_report,
-                CronTrigger(hour=23, minute=59, timezone=self.tz),
-                id='daily_report',
-                name='Daily Trading Report',
-                replace_existing=True
-            )
+            self.add_job('daily_report', self.send_daily_report,
+                         functools.partial(next_daily_time, hour=23, minute=59))
             
             # Heartbeat every 6 hours
-            self.scheduler.add_job(
-                self.send_heartbeat,
-                CronTrigger(hour='*/6', timezone=self.tz),
-                id='heartbeat',
-                name='Bot Heartbeat',
-                replace_existing=True
-            )
+            self.add_job('heartbeat', self.send_heartbeat,
+                         functools.partial(next_aligned_time, step=timedelta(hours=6)))
             
             # Kill switch check every 15 minutes
-            self.scheduler.add_job(
-                self.check_kill_switches,
-                CronTrigger(minute='*/15', timezone=self.tz),
-                id='kill_switch_check',
-                name='Kill Switch Check',
-                replace_existing=True
-            )
+            self.add_job('kill_switch_check', self.check_kill_switches,
+                         functools.partial(next_aligned_time, step=timedelta(minutes=15)))
+            
+            # Pick up settings edited from the config page every hour
+            self.add_job('reload_settings', self.reload_settings,
+                         functools.partial(next_aligned_time, step=timedelta(hours=1)))
             
             logger.info("Scheduler setup complete")
             logger.info(f"Daily report scheduled for 23:59 {self.tz}")
             logger.info(f"Heartbeat scheduled every 6 hours {self.tz}")
             logger.info(f"Kill switch check every 15 minutes {self.tz}")
+            logger.info(f"Settings reload every hour {self.tz}")
             
         except Exception as e:
             logger.error(f"Error setting up scheduler: {e}")
 
+    def add_job(self, name: str, coro_factory, next_run) -> None:
+        """
+        Schedule a coroutine function on the bot's event-loop scheduler
+        
+        Args:
+            name: Job name used in logs
+            coro_factory: Coroutine function called with no arguments
+            next_run: Callable returning the next run time after a given local datetime
+        """
+        run_at = next_run(datetime.now(self._job_tz))
+        heapq.heappush(self._jobs, (run_at.timestamp(), next(self._job_seq), name, coro_factory, next_run))
+
+    async def _scheduler(self) -> None:
+        """Run due jobs from the job heap; a single task, no threads"""
+        while self._jobs:
+            run_ts, _, name, coro_factory, next_run = self._jobs[0]
+            delay = run_ts - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue  # Re-check: the clock may have jumped while sleeping
+            heapq.heappop(self._jobs)
+            task = asyncio.create_task(coro_factory(), name=name)
+            self._job_tasks.add(task)
+            task.add_done_callback(self._job_tasks.discard)
+            now = datetime.fromtimestamp(max(run_ts, time.time()), self._job_tz)
+            heapq.heappush(self._jobs, (next_run(now).timestamp(), next(self._job_seq), name, coro_factory, next_run))
+
+    async def run_db(self, func, *args, **kwargs):
+        """Run a blocking repository call on the bot's DB thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, functools.partial(func, *args, **kwargs))
+
     async def check_kill_switches(self):
         """Check all kill switches and pause if needed"""
         try:
             logger.debug("Checking kill switches...")
             
-            # Get current equity and metrics
-            latest_equity = self.equity_repo.latest_equity()
-            today_metrics = self.equity_repo.today_metrics()
+            # Get current equity and metrics once for all checks
+            latest_equity = await self.run_db(self._job_equity_repo.latest_equity)
+            daily_pnl = (await self.run_db(self._job_equity_repo.today_metrics))['daily_pnl']
             current_equity = latest_equity.equity_usdt if latest_equity else 10000.0
             
             # Update peak equity if higher
             if current_equity > self.peak_equity:
-                self.peak_equity = current_equity
-                logger.info(f"New peak equity: ${self.peak_equity:,.2f}")
+                await self.run_db(self._bump_peak, current_equity, self._job_setting_repo)
             
             # 1. Daily Loss Stop Kill Switch
-            daily_loss_stop_pct = float(self.setting_repo.get_setting('daily_loss_stop_pct') or '0.015')
-            daily_loss_limit = self.peak_equity * daily_loss_stop_pct
+            daily_loss_limit = self.peak_equity * self.daily_stop_pct
             
-            if today_metrics and today_metrics['daily_pnl'] < -daily_loss_limit:
+            if daily_pnl < -daily_loss_limit:
                 await self.trigger_kill_switch(
                     "Daily Loss Stop",
-                    f"Daily P&L (${today_metrics['daily_pnl']:,.2f}) exceeded limit (${-daily_loss_limit:,.2f})"
+                    f"Daily P&L (${daily_pnl:,.2f}) exceeded limit (${-daily_loss_limit:,.2f})",
+                    current_equity=current_equity,
+                    peak_equity=self.peak_equity,
+                    daily_pnl=daily_pnl
                 )
                 return
             
@@ -169,7 +375,10 @@ class TradingBot:
                 if current_drawdown_pct >= self.max_drawdown_pct:
                     await self.trigger_kill_switch(
                         "Max Drawdown",
-                        f"Drawdown ({current_drawdown_pct:.1f}%) exceeded limit ({self.max_drawdown_pct}%)"
+                        f"Drawdown ({current_drawdown_pct:.1f}%) exceeded limit ({self.max_drawdown_pct}%)",
+                        current_equity=current_equity,
+                        peak_equity=self.peak_equity,
+                        daily_pnl=daily_pnl
                     )
                     return
             
@@ -177,7 +386,10 @@ class TradingBot:
             if self.api_failure_count >= self.max_api_failures:
                 await self.trigger_kill_switch(
                     "API Health",
-                    f"API failures ({self.api_failure_count}) exceeded limit ({self.max_api_failures})"
+                    f"API failures ({self.api_failure_count}) exceeded limit ({self.max_api_failures})",
+                    current_equity=current_equity,
+                    peak_equity=self.peak_equity,
+                    daily_pnl=daily_pnl
                 )
                 return
             
@@ -189,39 +401,32 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error checking kill switches: {e}")
 
-    async def trigger_kill_switch(self, switch_type: str, reason: str):
-        """Trigger a kill switch and pause trading"""
+    async def trigger_kill_switch(self, switch_type: str, reason: str, *, current_equity: float,
+                                  peak_equity: float, daily_pnl: float):
+        """Trigger a kill switch and pause trading, reporting the metrics the check used"""
         try:
             logger.warning(f"KILL SWITCH TRIGGERED: {switch_type} - {reason}")
             
             # Pause trading
-            self.setting_repo.set_setting('is_paused', 'true')
+            await self.run_db(self._job_setting_repo.set_setting, 'is_paused', 'true')
+            self._setting_cache['is_paused'] = (time.monotonic(), 'true')
             
             # Send Telegram alert
-            message = f"""
-🚨 <b>KILL SWITCH ACTIVATED</b>
-⚠️ {switch_type}
-
-📊 <b>Current Status</b>
-• Equity: ${self.equity_repo.latest_equity().equity_usdt:,.2f}
-• Peak Equity: ${self.peak_equity:,.2f}
-• Today's P&L: ${self.equity_repo.today_metrics()['daily_pnl']:,.2f}
-
-🔍 <b>Reason</b>
-{reason}
-
-🛑 <b>Action Taken</b>
-• Trading PAUSED
-• Manual intervention required
-• Use /resume to restart (after investigation)
-
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M')} {self.tz}
-            """.strip()
+            message = self.TPL_KILL_SWITCH.format_map({
+                'switch_type': switch_type,
+                'current_equity': current_equity,
+                'peak_equity': peak_equity,
+                'daily_pnl': daily_pnl,
+                'reason': reason,
+                'now': datetime.now(),
+                'tz': self.tz,
+            })
             
             await self.tg_send(message)
             
             # Log alert
-            self.alert_repo.insert_alert(
+            await self.run_db(
+                self._job_alert_repo.insert_alert,
                 'error',
                 f"Kill switch triggered: {switch_type} - {reason}"
             )
@@ -238,37 +443,36 @@ class TradingBot:
         
         if self.api_failure_count >= self.max_api_failures:
             logger.error(f"API failure limit reached ({self.api_failure_count})")
-            asyncio.create_task(self.check_kill_switches())
+            # At most one kill-switch check in flight, however fast failures arrive
+            if self._killswitch_task is None or self._killswitch_task.done():
+                self._killswitch_task = asyncio.create_task(self.check_kill_switches())
 
     def record_api_success(self):
         """Record successful API call"""
-        if self.api_failure_count > 0:
+        if self.api_failure_count:
             logger.info(f"API success recorded. Resetting failure count from {self.api_failure_count}")
-            self.api_failure_count = 0
+        self.api_failure_count = 0
 
     async def tg_send(self, message: str) -> bool:
         """Send message via Telegram"""
         try:
-            if not settings.TG_BOT_TOKEN or not settings.TG_CHAT_ID:
+            if not self._tg_url or not settings.TG_CHAT_ID:
                 logger.warning("Telegram credentials not configured")
                 return False
                 
-            import httpx
-            url = f"https://api.telegram.org/bot{settings.TG_BOT_TOKEN}/sendMessage"
             data = {
                 "chat_id": settings.TG_CHAT_ID,
                 "text": message,
                 "parse_mode": "HTML"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=data, timeout=10.0)
-                if response.status_code == 200:
-                    logger.info("Telegram message sent successfully")
-                    return True
-                else:
-                    logger.error(f"Telegram API error: {response.status_code} - {response.text}")
-                    return False
+            response = await self._http.post(self._tg_url, json=data)
+            if response.status_code == 200:
+                logger.info("Telegram message sent successfully")
+                return True
+            else:
+                logger.error(f"Telegram API error: {response.status_code} - {response.text}")
+                return False
                     
         except Exception as e:
             logger.error(f"Error sending Telegram message: {e}")
@@ -280,62 +484,54 @@ class TradingBot:
             logger.info("Generating daily report...")
             
             # Get today's metrics
-            today_metrics = self.equity_repo.today_metrics()
-            latest_equity = self.equity_repo.latest_equity()
-            
-            # Get today's trades
-            today_trades = self.trade_repo.get_trades_by_date(datetime.now().date())
-            closed_trades = [t for t in today_trades if t.exit_ts is not None]
-            
-            # Calculate metrics
-            total_trades = len(closed_trades)
-            winning_trades = len([t for t in closed_trades if t.pnl_usdt and t.pnl_usdt > 0])
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+            today_metrics = await self.run_db(self._job_equity_repo.today_metrics)
+            latest_equity = await self.run_db(self._job_equity_repo.latest_equity)
             
-            total_pnl = sum(t.pnl_usdt for t in closed_trades if t.pnl_usdt)
-            avg_pnl = total_pnl / total_trades if total_trades > 0 else 0
+            # Aggregate today's closed trades in the database
+            stats = await self.run_db(self._job_trade_repo.daily_stats, datetime.now().date())
+            total_trades = stats['total_trades']
+            total_pnl = stats['total_pnl']
+            avg_pnl = stats['avg_pnl']
+            win_rate = (stats['winning_trades'] / total_trades * 100) if total_trades > 0 else 0
             
             # Get open positions
-            open_trades = self.trade_repo.get_open_trades()
-            open_positions = len(open_trades)
+            open_symbols = await self.run_db(self._job_trade_repo.get_open_symbols)
+            open_positions = len(open_symbols)
+            is_paused = await self.run_db(self.is_paused, self._job_setting_repo)
             
             # Calculate drawdown
             current_equity = latest_equity.equity_usdt if latest_equity else 10000.0
             drawdown_pct = ((self.peak_equity - current_equity) / self.peak_equity * 100) if self.peak_equity > 0 else 0
             
             # Format message
-            message = f"""
-📊 <b>Daily Trading Report</b>
-📅 {datetime.now().strftime('%Y-%m-%d')}
-
-💰 <b>Equity</b>
-• Current: ${current_equity:,.2f}
-• Peak: ${self.peak_equity:,.2f}
-• Drawdown: {drawdown_pct:.1f}%
-• Today's P&L: ${today_metrics['daily_pnl']:,.2f}
-
-📈 <b>Trading Summary</b>
-• Total Trades: {total_trades}
-• Win Rate: {win_rate:.1f}%
-• Total P&L: ${total_pnl:,.2f}
-• Avg P&L: ${avg_pnl:,.2f}
-
-🔄 <b>Open Positions</b>
-• Count: {open_positions}
-• Symbols: {', '.join([t.symbol for t in open_trades]) if open_trades else 'None'}
-
-⚙️ <b>Bot Status</b>
-• Mode: {self.mode.upper()}
-• Paused: {'Yes' if self.is_paused() else 'No'}
-• API Failures: {self.api_failure_count}/{self.max_api_failures}
-            """.strip()
+            message = self.TPL_DAILY_REPORT.format_map({
+                'now': datetime.now(),
+                'current_equity': current_equity,
+                'peak_equity': self.peak_equity,
+                'drawdown_pct': drawdown_pct,
+                'daily_pnl': today_metrics['daily_pnl'],
+                'total_trades': total_trades,
+                'win_rate': win_rate,
+                'total_pnl': total_pnl,
+                'avg_pnl': avg_pnl,
+                'open_positions': open_positions,
+                'symbols': ', '.join(open_symbols) if open_symbols else 'None',
+                'mode': self.mode.upper(),
+                'paused': 'Yes' if is_paused else 'No',
+                'api_failures': self.api_failure_count,
+                'max_api_failures': self.max_api_failures,
+            })
             
             # Send report
             success = await self.tg_send(message)
             if success:
                 logger.info("Daily report sent successfully")
                 # Log alert
-                self.alert_repo.insert_alert('info', f"Daily report sent: {total_trades} trades, ${total_pnl:,.2f} P&L")
+                await self.run_db(
+                    self._job_alert_repo.insert_alert,
+                    'info',
+                    f"Daily report sent: {total_trades} trades, ${total_pnl:,.2f} P&L"
+                )
             else:
                 logger.error("Failed to send daily report")
                 
@@ -348,12 +544,12 @@ class TradingBot:
             logger.info("Sending heartbeat...")
             
             # Get current status
-            latest_equity = self.equity_repo.latest_equity()
-            is_paused = self.is_paused()
-            open_trades = self.trade_repo.get_open_trades()
+            latest_equity = await self.run_db(self._job_equity_repo.latest_equity)
+            is_paused = await self.run_db(self.is_paused, self._job_setting_repo)
+            open_trades = await self.run_db(self._job_trade_repo.get_open_trades)
             
             # Get last trade
-            recent_trades = self.trade_repo.recent_trades(limit=1)
+            recent_trades = await self.run_db(self._job_trade_repo.recent_trades, limit=1)
             last_trade = recent_trades[0] if recent_trades else None
             
             # Calculate drawdown
@@ -361,30 +557,29 @@ class TradingBot:
             drawdown_pct = ((self.peak_equity - current_equity) / self.peak_equity * 100) if self.peak_equity > 0 else 0
             
             # Format message
-            message = f"""
-💓 <b>Bot Heartbeat</b>
-🕐 {datetime.now().strftime('%Y-%m-%d %H:%M')} {self.tz}
-
-⚙️ <b>Status</b>
-• Mode: {self.mode.upper()}
-• Paused: {'Yes' if is_paused else 'No'}
-• Running: {'Yes' if self.is_running else 'No'}
-
-💰 <b>Equity</b>
-• Current: ${current_equity:,.2f}
-• Peak: ${self.peak_equity:,.2f}
-• Drawdown: {drawdown_pct:.1f}%
-
-📊 <b>Positions</b>
-• Open: {len(open_trades)}
-• Symbols: {', '.join([t.symbol for t in open_trades]) if open_trades else 'None'}
-
-🔄 <b>Last Trade</b>
-{f"• {last_trade.symbol} - {last_trade.entry_ts.strftime('%H:%M')} - ${last_trade.entry_price:.2f}" if last_trade else "• No trades yet"}
-
-🔧 <b>Health</b>
-• API Failures: {self.api_failure_count}/{self.max_api_failures}
-            """.strip()
+            if last_trade:
+                last_trade_line = self.TPL_LAST_TRADE.format_map({
+                    'symbol': last_trade.symbol,
+                    'entry_ts': last_trade.entry_ts,
+                    'entry_price': last_trade.entry_price,
+                })
+            else:
+                last_trade_line = "• No trades yet"
+            message = self.TPL_HEARTBEAT.format_map({
+                'now': datetime.now(),
+                'tz': self.tz,
+                'mode': self.mode.upper(),
+                'paused': 'Yes' if is_paused else 'No',
+                'running': 'Yes' if self.is_running else 'No',
+                'current_equity': current_equity,
+                'peak_equity': self.peak_equity,
+                'drawdown_pct': drawdown_pct,
+                'open_positions': len(open_trades),
+                'symbols': ', '.join(t.symbol for t in open_trades) if open_trades else 'None',
+                'last_trade': last_trade_line,
+                'api_failures': self.api_failure_count,
+                'max_api_failures': self.max_api_failures,
+            })
             
             # Send heartbeat
             success = await self.tg_send(message)
@@ -396,19 +591,54 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error sending heartbeat: {e}")
 
-    def is_paused(self) -> bool:
-        """Check if bot is paused"""
+    def _reload_trading_config(self) -> None:
+        """
+        Re-read DAILY_LOSS_STOP_PCT from trading_config, which the config page rewrites
+        
+        trading_config is the source of truth; the settings table's bootstrapped
+        daily_loss_stop_pct row is not an override (nothing edits it).
+        """
+        try:
+            import trading_config
+            trading_config = importlib.reload(trading_config)
+            self.daily_stop_pct = trading_config.DAILY_LOSS_STOP_PCT
+            self.risk_manager.set_daily_loss_stop_pct(self.daily_stop_pct)
+        except ImportError:
+            pass  # No config file: keep the defaults chosen in __init__
+        except Exception as e:
+            logger.error(f"Error reloading trading_config: {e}")
+
+    async def reload_settings(self) -> None:
+        """Re-read trading_config and drop cached settings"""
+        # A small local module; reloading on the loop keeps the risk manager single-threaded
+        self._reload_trading_config()
+        self._setting_cache.clear()
+        logger.info(f"Settings reloaded: daily loss stop {self.daily_stop_pct * 100:.2f}%")
+
+    def get_setting_cached(self, key: str, setting_repo: SettingRepository = None) -> Optional[str]:
+        """Get a setting, reusing a value read within the last SETTING_CACHE_TTL seconds"""
+        cached = self._setting_cache.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < SETTING_CACHE_TTL:
+            return cached[1]
+        
+        value = (setting_repo or self.setting_repo).get_setting(key)
+        self._setting_cache[key] = (now, value)
+        return value
+
+    def is_paused(self, setting_repo: SettingRepository = None) -> bool:
+        """Check if bot is paused (setting_repo selects the session to read with)"""
         try:
-            is_paused_setting = self.setting_repo.get_setting('is_paused')
+            is_paused_setting = self.get_setting_cached('is_paused', setting_repo)
             return is_paused_setting == 'true'
         except Exception as e:
             logger.error(f"Error checking pause status: {e}")
             return False
 
-    def get_open_trades(self) -> list:
-        """Get open trades"""
+    def get_open_trades(self, trade_repo: TradeRepository = None) -> list:
+        """Get open trades (trade_repo selects the session to read with)"""
         try:
-            return self.trade_repo.get_open_trades()
+            return (trade_repo or self.trade_repo).get_open_trades()
         except Exception as e:
             logger.error(f"Error getting open trades: {e}")
             return []
@@ -419,16 +649,16 @@ class TradingBot:
             balances = self.exchange.balances()
             total_equity = balances.get('USDT', 0.0)
             
-            # Add value of crypto holdings
-            for symbol, qty in balances.items():
-                if symbol != 'USDT' and qty > 0:
-                    try:
-                        # Get current price for the symbol
-                        current_price = self.exchange._get_current_price(f"{symbol}USDT")
-                        if current_price:
-                            total_equity += qty * current_price
-                    except:
-                        pass
+            # Add value of crypto holdings, priced with one ticker request
+            holdings = {f"{asset}USDT": qty for asset, qty in balances.items() if asset != 'USDT' and qty > 0}
+            prices = self.exchange.get_prices(list(holdings)) if holdings else {}
+            for symbol, qty in holdings.items():
+                try:
+                    current_price = prices.get(symbol) or self.exchange._get_current_price(symbol)
+                    if current_price:
+                        total_equity += qty * current_price
+                except:
+                    pass
             
             return total_equity
             
@@ -436,6 +666,25 @@ class TradingBot:
             logger.error(f"Error getting current equity: {e}")
             return self.initial_equity  # Fallback to config value
 
+    def _load_peak_equity(self) -> float:
+        """Peak equity persisted by _bump_peak, or the initial equity on first run"""
+        try:
+            return float(self.setting_repo.get_setting('peak_equity') or self.initial_equity)
+        except Exception as e:
+            logger.error(f"Error loading peak equity: {e}")
+            return self.initial_equity
+
+    def _bump_peak(self, equity: float, setting_repo: SettingRepository = None) -> None:
+        """Raise and persist the peak equity if equity is a new high"""
+        if equity <= self.peak_equity:
+            return
+        self.peak_equity = equity
+        try:
+            (setting_repo or self.setting_repo).set_setting('peak_equity', str(equity))
+        except Exception as e:
+            logger.error(f"Error saving peak equity: {e}")
+        logger.info(f"New peak equity: ${equity:,.2f}")
+
     def update_equity(self) -> None:
         """Update equity snapshot"""
         try:
@@ -445,9 +694,7 @@ class TradingBot:
             self.risk_manager.update_equity(total_equity)
             
             # Update peak equity if higher
-            if total_equity > self.peak_equity:
-                self.peak_equity = total_equity
-                logger.info(f"New peak equity: ${self.peak_equity:,.2f}")
+            self._bump_peak(total_equity)
             
             logger.info(f"Equity updated: ${total_equity:,.2f}")
             
@@ -467,37 +714,36 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error fixing P&L calculation: {e}")
 
-    def detect_new_bar(self, df: 'pd.DataFrame') -> bool:
-        """Detect if we have a new bar"""
-        try:
-            if df.empty:
-                return False
-                
-            # Since timestamp is the index, we need to access it differently
-            latest_time = df.index[-1]
-            if isinstance(latest_time, str):
-                latest_time = datetime.fromisoformat(latest_time.replace('Z', '+00:00'))
-            
-            if self.last_bar_time is None or latest_time > self.last_bar_time:
-                self.last_bar_time = latest_time
-                self.current_bar += 1
-                return True
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error detecting new bar: {e}")
+    def detect_new_bar(self, df: pd.DataFrame) -> bool:
+        """Detect if we have a new bar, comparing open times as int64 nanoseconds"""
+        if not len(df):
             return False
+        
+        latest_ns = int(df.index.values[-1].astype('datetime64[ns]').view('int64'))
+        if latest_ns > self._last_bar_ns:
+            self._last_bar_ns = latest_ns
+            self.current_bar += 1
+            return True
+        return False
 
     def manage_exits(self) -> None:
         """Manage trade exits"""
         try:
             open_trades = self.get_open_trades()
+            if not open_trades:
+                return
+            
+            # One ticker request for every open symbol
+            prices = self.exchange.get_prices([t.symbol for t in open_trades])
             for trade in open_trades:
                 # Get current price
                 try:
-                    current_price = self.exchange._get_current_price(trade.symbol)
-                except:
-                    continue
+                    current_price = prices[trade.symbol]
+                except KeyError:
+                    try:
+                        current_price = self.exchange._get_current_price(trade.symbol)
+                    except:
+                        continue
                 
                 # Check stop loss
                 if current_price <= trade.sl:
@@ -540,13 +786,13 @@ class TradingBot:
             self.risk_manager.record_trade_close(self.current_bar)
             
             # Send Telegram notification
-            message = f"""
-🔴 <b>Trade Closed</b>
-📊 {trade.symbol}
-💰 P&L: ${pnl_usdt:,.2f} ({pnl_pct:+.2f}%)
-📈 Exit: ${exit_price:.2f}
-🎯 Reason: {reason}
-            """.strip()
+            message = self.TPL_TRADE_CLOSED.format_map({
+                'symbol': trade.symbol,
+                'pnl_usdt': pnl_usdt,
+                'pnl_pct': pnl_pct,
+                'exit_price': exit_price,
+                'reason': reason,
+            })
             
             asyncio.create_task(self.tg_send(message))
             
@@ -561,21 +807,29 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error closing trade: {e}")
 
-    def should_enter_trade(self) -> bool:
-        """Check if we should enter a new trade"""
+    def _entry_allowed_by_db(self, setting_repo: SettingRepository = None,
+                             trade_repo: TradeRepository = None) -> bool:
+        """Database side of should_enter_trade: not paused and no open trade for the symbol"""
         try:
             # Check if paused
-            if self.is_paused():
+            if self.is_paused(setting_repo):
                 logger.info("Trading is paused")
                 return False
             
             # Check if we have open trades for this symbol
-            open_trades = self.get_open_trades()
+            open_trades = self.get_open_trades(trade_repo)
             if any(t.symbol == self.symbol for t in open_trades):
                 logger.info(f"Already have open trades for {self.symbol}")
                 return False
+            return True
             
-            # Check risk manager
+        except Exception as e:
+            logger.error(f"Error checking if should enter trade: {e}")
+            return False
+
+    def _entry_allowed_by_risk(self) -> bool:
+        """Risk-manager side of should_enter_trade"""
+        try:
             can_trade = self.risk_manager.can_open_trade(self.current_bar)
             if not can_trade:
                 logger.info("Risk manager prevents trading")
@@ -585,105 +839,276 @@ class TradingBot:
             logger.error(f"Error checking if should enter trade: {e}")
             return False
 
-    async def process_signal(self, signal: Dict) -> None:
+    def should_enter_trade(self, setting_repo: SettingRepository = None,
+                           trade_repo: TradeRepository = None) -> bool:
+        """Check if we should enter a new trade"""
+        return self._entry_allowed_by_db(setting_repo, trade_repo) and self._entry_allowed_by_risk()
+
+    async def process_signal(self, signal: SignalResult) -> None:
         """Process a trading signal"""
         try:
-            if signal['signal'] != 'long':
-                logger.info(f"Signal is not long: {signal['signal']}")
+            if signal.signal != 'long':
+                logger.info(f"Signal is not long: {signal.signal}")
                 return
 
-            if not self.should_enter_trade():
+            # Repository reads use the DB thread's own session; the risk manager
+            # is only touched from the event loop
+            if not (await self.run_db(self._entry_allowed_by_db, self._job_setting_repo, self._job_trade_repo)
+                    and self._entry_allowed_by_risk()):
                 logger.info("Should not enter trade - checking conditions...")
                 return
 
-            symbol_info = self.exchange.get_symbol_info(self.symbol)
+            symbol_info = await self.exchange.aget_symbol_info(self.symbol)
             lot_step = symbol_info.get('stepSize', 0.001)
             
-            logger.info(f"Processing LONG signal - Entry: ${signal['entry_ref_price']:.2f}, SL: ${signal['sl']:.2f}, Lot Step: {lot_step}")
+            logger.info(f"Processing LONG signal - Entry: ${signal.entry_ref_price:.2f}, SL: ${signal.sl:.2f}, Lot Step: {lot_step}")
 
+            self.risk_manager.set_lot_step(lot_step)
             qty = self.risk_manager.calculate_position_size(
-                signal['entry_ref_price'],
-                signal['sl'],
-                lot_step
+                signal.entry_ref_price,
+                signal.sl
             )
 
             if qty <= 0:
                 logger.warning(f"Position size is zero or negative: {qty}")
                 return
 
-            trade = self.trade_repo.open_trade(
+            trade = await self.run_db(
+                self._job_trade_repo.open_trade,
                 symbol=self.symbol,
                 qty=qty,
-                entry_price=signal['entry_ref_price'],
-                sl=signal['sl'],
-                tp1=signal['tp1'],
+                entry_price=signal.entry_ref_price,
+                sl=signal.sl,
+                tp1=signal.tp1,
                 trail_mult=0.02
             )
 
             self.risk_manager.increment_trades_today()
-            message = f"""
-🟢 <b>Trade Entry</b>
-📊 {qty} {self.symbol}
-💰 Price: ${signal['entry_ref_price']:.2f}
-🛑 SL: ${signal['sl']:.2f}
-🎯 TP1: ${signal['tp1']:.2f}
-            """.strip()
+            message = self.TPL_TRADE_ENTRY.format_map({
+                'qty': qty,
+                'symbol': self.symbol,
+                'entry_price': signal.entry_ref_price,
+                'sl': signal.sl,
+                'tp1': signal.tp1,
+            })
             
             await self.tg_send(message)
-            logger.info(f"Trade opened: {qty} {self.symbol} @ ${signal['entry_ref_price']:.2f}")
+            logger.info(f"Trade opened: {qty} {self.symbol} @ ${signal.entry_ref_price:.2f}")
 
         except Exception as e:
             logger.error(f"Error processing signal: {e}")
 
-    async def trading_loop(self) -> None:
-        """Main trading loop"""
-        logger.info("Starting trading loop...")
-        self.is_running = True
-        
-        # Start scheduler
-        self.scheduler.start()
-        logger.info("Scheduler started")
+    async def handle_new_bar(self, df: pd.DataFrame) -> None:
+        """Run the strategy on a frame whose last row is a newly closed bar"""
+        try:
+            if self.detect_new_bar(df):
+                logger.info(f"New {self.interval} bar detected")
+                signal = generate_signal_from_indicators(self.latest_indicators(df))
+                await self.process_signal(signal)
+                self.manage_exits()
+                if self.current_bar % 4 == 0:  # Hourly update for 15m bars
+                    self.update_equity()
+        except Exception as e:
+            logger.error(f"Error handling new bar: {e}")
 
-        while self.is_running:
-            try:
-                df = self.exchange.get_klines(self.symbol, self.interval, limit=100)
-                if df.empty:
-                    logger.warning("No klines data received")
-                    self.record_api_failure()
-                    await asyncio.sleep(5)
-                    continue
+    def latest_indicators(self, df: pd.DataFrame) -> Dict:
+        """Advance the running indicators by the newest bar of df"""
+        indicators = self.ind_state.advance(df)
+        
+        # Cross-check the incremental values against a full recomputation. The
+        # buffer is a rolling window, so the recompute's EMA warm-up differs a
+        # little from the running state; only a real divergence is flagged.
+        if logger.isEnabledFor(logging.DEBUG):
+            full = calculate_all_indicators(df).iloc[-1]
+            mismatched = {
+                key: (value, full[key]) for key, value in indicators.items()
+                if not np.isclose(value, full[key], rtol=1e-2, atol=1e-2, equal_nan=True)
+            }
+            if mismatched:
+                logger.error(f"Incremental indicators diverged from full recompute: {mismatched}")
+            else:
+                logger.debug("Incremental indicators match full recompute")
+        
+        return indicators
 
-                # Record successful API call
-                self.record_api_success()
+    async def warm_kline_buffer(self) -> bool:
+        """Fill the kline buffer from REST before (re)subscribing to the stream"""
+        df = await self.exchange.aget_klines(self.symbol, self.interval, limit=KLINE_BUFFER_SIZE)
+        if df.empty:
+            logger.warning("No klines data received")
+            self.record_api_failure()
+            return False
+        
+        self.record_api_success()
+        # The newest REST bar is still forming; the stream delivers its final values
+        self.bars = df.iloc[:-1]
+        return True
 
-                if self.detect_new_bar(df):
-                    logger.info(f"New {self.interval} bar detected")
-                    df_with_indicators = calculate_all_indicators(df)
-                    signal = generate_signal(df_with_indicators)
-                    await self.process_signal(signal)
-                    self.manage_exits()
-                    if self.current_bar % 4 == 0:  # Hourly update for 15m bars
-                        self.update_equity()
+    def _start_kline_stream(self, loop: asyncio.AbstractEventLoop, messages: asyncio.Queue) -> SpotWebsocketStreamClient:
+        """Connect the kline websocket; its thread hands raw messages to the event loop"""
+        def on_message(_, message):
+            loop.call_soon_threadsafe(messages.put_nowait, message)
+        
+        def on_close(_):
+            loop.call_soon_threadsafe(messages.put_nowait, None)
+        
+        def on_error(_, error):
+            logger.error(f"Kline stream error: {error}")
+            loop.call_soon_threadsafe(messages.put_nowait, None)
+        
+        ws = SpotWebsocketStreamClient(
+            stream_url=BINANCE_WS_URL,
+            on_message=on_message,
+            on_close=on_close,
+            on_error=on_error
+        )
+        ws.kline(symbol=self.symbol.lower(), interval=self.interval)
+        return ws
 
-                await asyncio.sleep(5)
+    def _append_closed_bar(self, kline: Dict) -> pd.DataFrame:
+        """Append a closed stream kline to the rolling buffer"""
+        # Same index dtype as SpotClient._klines_to_frame: datetime64[ns]
+        open_time = np.array([kline['t']], dtype='datetime64[ms]').astype('datetime64[ns]')
+        row = pd.DataFrame(
+            [[float(kline['o']), float(kline['h']), float(kline['l']), float(kline['c']), float(kline['v'])]],
+            columns=['open', 'high', 'low', 'close', 'volume'],
+            index=pd.DatetimeIndex(open_time, name='timestamp')
+        )
+        
+        bars = self.bars[self.bars.index < open_time[0]]
+        self.bars = pd.concat([bars, row]).iloc[-KLINE_BUFFER_SIZE:]
+        return self.bars
 
-            except KeyboardInterrupt:
-                logger.info("Trading loop interrupted")
-                break
+    async def stream_klines(self) -> None:
+        """Consume the kline websocket, acting once per closed bar, reconnecting with backoff"""
+        loop = asyncio.get_running_loop()
+        failures = 0
+        
+        while self.is_running:
+            ws = None
+            try:
+                if self.bars is None and not await self.warm_kline_buffer():
+                    raise ConnectionError("Could not warm kline buffer")
+                
+                messages = asyncio.Queue()
+                ws = await asyncio.to_thread(self._start_kline_stream, loop, messages)
+                logger.info(f"Subscribed to {self.symbol} {self.interval} kline stream")
+                
+                while self.is_running:
+                    message = await asyncio.wait_for(messages.get(), timeout=STREAM_STALE_TIMEOUT)
+                    if message is None:
+                        raise ConnectionError("Kline stream closed")
+                    
+                    # Record successful API call
+                    self.record_api_success()
+                    failures = 0
+                    
+                    kline = orjson.loads(message).get('k')
+                    if kline and kline['x']:
+                        await self.bar_queue.put(self._append_closed_bar(kline))
+                        
+            except asyncio.TimeoutError:
+                logger.warning(f"No kline stream messages for {STREAM_STALE_TIMEOUT}s")
+                self.record_api_failure()
             except Exception as e:
-                logger.error(f"Error in trading loop: {e}")
+                logger.error(f"Error in kline stream: {e}")
                 self.record_api_failure()
+            finally:
+                if ws is not None:
+                    await asyncio.to_thread(ws.stop)
+            
+            if self.is_running:
+                failures += 1
+                delay = min(2 ** failures, STREAM_MAX_BACKOFF)
+                logger.info(f"Reconnecting kline stream in {delay}s")
+                # Re-warm so bars missed while disconnected are fetched from REST
+                self.bars = None
+                await asyncio.sleep(delay)
+
+    async def poll_closed_bars(self) -> None:
+        """REST bar source: fetch klines once, just after each bar closes"""
+        period = interval_seconds(self.interval)
+        retry = False
+        
+        while self.is_running:
+            if not retry:
+                await asyncio.sleep(period - time.time() % period + BAR_CLOSE_DELAY)
+            
+            if self.bars is None or self.bars.empty:
+                df = await self.exchange.aget_klines(self.symbol, self.interval, limit=KLINE_BUFFER_SIZE + 1)
+            else:
+                # Only fetch the bars opened after the newest cached one
+                start_ms = self.bars.index[-1].value // 1_000_000 + 1
+                df = await self.exchange.aget_klines_since(self.symbol, self.interval, start_ms,
+                                                           limit=KLINE_BUFFER_SIZE + 1)
+            if df.empty:
+                logger.warning("No klines data received")
+                self.record_api_failure()
+                retry = True
                 await asyncio.sleep(5)
+                continue
+            
+            # Record successful API call
+            self.record_api_success()
+            retry = False
+            
+            # The newest row is the bar that has just opened
+            closed = df.iloc[:-1]
+            if closed.empty:
+                continue
+            if self.bars is None or self.bars.empty:
+                self.bars = closed
+            else:
+                self.bars = pd.concat([self.bars, closed]).iloc[-KLINE_BUFFER_SIZE:]
+            await self.bar_queue.put(self.bars)
+
+    def _on_bar_source_done(self, task: asyncio.Task) -> None:
+        """Wake the trading loop when the bar source stops"""
+        if not task.cancelled() and task.exception():
+            logger.error(f"Bar source stopped: {task.exception()}")
+        if self.bar_queue.full():
+            self.bar_queue.get_nowait()
+        self.bar_queue.put_nowait(None)
+
+    async def trading_loop(self) -> None:
+        """Main trading loop: consume closed bars as the bar source produces them"""
+        logger.info("Starting trading loop...")
+        self.is_running = True
+        
+        # Start scheduler
+        self._scheduler_task = asyncio.create_task(self._scheduler())
+        logger.info("Scheduler started")
+
+        # The websocket stream is the default bar source; REST polls once per bar
+        if settings.BAR_SOURCE == "rest":
+            bar_source = self.poll_closed_bars()
+        else:
+            bar_source = self.stream_klines()
+        self._bar_source_task = asyncio.create_task(bar_source)
+        self._bar_source_task.add_done_callback(self._on_bar_source_done)
+        logger.info(f"Bar source: {settings.BAR_SOURCE}")
+
+        try:
+            while self.is_running:
+                df = await self.bar_queue.get()
+                if df is None:
+                    break
+                await self.handle_new_bar(df)
+        except KeyboardInterrupt:
+            logger.info("Trading loop interrupted")
+        finally:
+            self._bar_source_task.cancel()
+            self._scheduler_task.cancel()
 
-        # Stop scheduler
-        self.scheduler.shutdown()
         logger.info("Trading loop stopped")
 
     def stop(self) -> None:
         """Stop the trading bot"""
         self.is_running = False
-        if hasattr(self, 'scheduler'):
-            self.scheduler.shutdown()
+        if self._bar_source_task is not None:
+            self._bar_source_task.cancel()
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
         logger.info("Trading bot stop requested")
 
 async def main():
@@ -695,12 +1120,23 @@ async def main():
         )
         logger.info(f"Starting SOL Spot Bot in {settings.MODE} mode")
         logger.info(f"Timezone: {settings.TZ}")
-        bot = TradingBot()
-        await bot.trading_loop()
+        async with TradingBot() as bot:
+            await bot.trading_loop()
     except Exception as e:
         logger.error(f"Error in main: {e}")
         raise
 
 
+def install_event_loop() -> None:
+    """Use uvloop's faster event loop when it is installed (Linux/macOS only)"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not installed, using the default asyncio event loop")
+        return
+    uvloop.install()
+
+
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(main())
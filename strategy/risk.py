@@ -1,14 +1,107 @@
-import math
 import logging
-from typing import Optional, Dict, List
+import time
+import numpy as np
+from enum import IntEnum
+from functools import lru_cache
+from typing import Optional, Dict, List, NamedTuple, Literal
 from datetime import datetime, date
-from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+MAX_TRADES_PER_DAY = 20  # Optional safety cap on entries per day
+RISK_CACHE_SIZE = 1024  # Entries kept by the lru_cache'd pure helpers below
+LOT_TICK_TOLERANCE = 1e-9  # Fraction of a lot forgiven when counting whole lot-step ticks
+# Position multiplier by signal quality: < 60 -> 0.7, 60-80 -> 1.0, >= 80 -> 1.2
+SIGNAL_QUALITY_BINS = (60.0, 80.0)
+SIGNAL_QUALITY_MULTIPLIERS = (0.7, 1.0, 1.2)
+_SQ_MULS = np.array(SIGNAL_QUALITY_MULTIPLIERS)
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')  # By weekday()
+
+
+class LossCat(IntEnum):
+    """Index of each loss counter in RiskManager._loss_counts"""
+    STOP = 0  # Stop-loss hits (any losing trade)
+    LARGE = 1  # Loss larger than 2%
+    QUICK = 2  # Loss within an hour of entry
+
+
+class BlockReason(IntEnum):
+    """Why RiskManager.can_trade() allowed or blocked a trade; see reason_str()"""
+    OK = 0
+    CONSECUTIVE_LOSSES = 1
+    SIGNAL_LOW = 2
+    HIGH_VOL = 3
+    LOW_VOLUME = 4
+    WORST_HOUR = 5
+    WORST_DAY = 6
+    NO_EQUITY = 7
+    DAILY_STOP = 8
+
+
+_BLOCK_REASON_TEMPLATES = {
+    BlockReason.OK: "Trading allowed",
+    BlockReason.CONSECUTIVE_LOSSES: "Max consecutive losses ({max_losses}) reached. Cooldown: {remaining:.1f}h remaining",
+    BlockReason.SIGNAL_LOW: "Signal quality too low: {signal_quality:.1f}% (minimum 50%)",
+    BlockReason.HIGH_VOL: "Market volatility too high - avoid trading",
+    BlockReason.LOW_VOLUME: "Market volume too low - avoid trading",
+    BlockReason.WORST_HOUR: "Trading hour {hour}:00 in worst performing period (06:00-12:00)",
+    BlockReason.WORST_DAY: "Trading day {day} in worst performing period",
+    BlockReason.NO_EQUITY: "Insufficient equity",
+    BlockReason.DAILY_STOP: "Daily loss limit reached: ${daily_pnl:.2f}",
+}
+
+
+def reason_str(code: BlockReason, ctx: Dict) -> str:
+    """
+    Human-readable message for a can_trade() result
+    
+    Args:
+        code: BlockReason returned by can_trade()
+        ctx: Context dict returned alongside it
+    
+    Returns:
+        str: Formatted reason
+    """
+    if code == BlockReason.CONSECUTIVE_LOSSES and 'remaining' not in ctx:
+        return f"Max consecutive losses ({ctx['max_losses']}) reached. Cooldown active"
+    return _BLOCK_REASON_TEMPLATES[code].format_map(ctx)
+
+
+class CooldownStatus(NamedTuple):
+    """Snapshot of a CooldownTracker"""
+    is_in_cooldown: bool
+    bars_since_close: int
+    cooldown_bars: int
+    last_close_bar: Optional[int]
+
+
+class RiskSummary(NamedTuple):
+    """Snapshot of a RiskManager's risk state"""
+    current_equity: float
+    risk_per_trade_pct: float
+    consecutive_losses: int
+    max_consecutive_losses: int
+    risk_multiplier: float
+    recent_trades_count: int
+    win_rate: float
+    loss_patterns: Dict
+    can_trade: bool
+
+
+def _position_size_core(equity_usdt: float, price_diff: float, risk_pct: float, lot_step: float) -> float:
+    """Risk-based quantity rounded down to lot_step; inputs must already be valid (price_diff > 0)"""
+    # Whole lot-step ticks, with LOT_TICK_TOLERANCE so exact multiples that land
+    # just below an integer keep their last lot (0.3 / 0.1 == 2.9999999999999996,
+    # 0.29 * 100.0 == 28.999999999999996)
+    # Scaling back by dividing by the (integral) inverse step returns the float
+    # nearest to ticks * lot_step: 3 / 10.0 == 0.3, whereas 3 * 0.1 == 0.30000000000000004
+    inv_step = 1.0 / lot_step
+    ticks = int(equity_usdt * risk_pct / price_diff * inv_step + LOT_TICK_TOLERANCE)
+    return ticks / inv_step
+
 
 def position_size(equity_usdt: float, entry_price: float, stop_price: float, 
-                 risk_pct: float, lot_step: float) -> float:
+                 risk_pct: float, lot_step: float, side: Literal['long', 'short'] = 'long') -> float:
     """
     Calculate position size based on risk percentage
     
@@ -18,6 +111,7 @@ def position_size(equity_usdt: float, entry_price: float, stop_price: float,
         stop_price: Stop loss price
         risk_pct: Risk percentage (0.01 = 1%)
         lot_step: Minimum lot size step (e.g., 0.001 for SOL)
+        side: 'long' (stop below entry) or 'short' (stop above entry)
     
     Returns:
         float: Position quantity rounded to lot_step
@@ -25,55 +119,69 @@ def position_size(equity_usdt: float, entry_price: float, stop_price: float,
     Example:
         equity=10k, risk=0.5%, entry=150, sl=145 → qty≈10 SOL
     """
-    try:
-        # Validate inputs
-        if equity_usdt <= 0:
-            logger.error("Equity must be positive")
-            return 0.0
-        
-        if entry_price <= 0:
-            logger.error("Entry price must be positive")
-            return 0.0
-        
-        if stop_price <= 0:
-            logger.error("Stop price must be positive")
-            return 0.0
-        
-        if risk_pct <= 0 or risk_pct > 1:
-            logger.error("Risk percentage must be between 0 and 1")
-            return 0.0
-        
-        if lot_step <= 0:
-            logger.error("Lot step must be positive")
-            return 0.0
-        
-        # Calculate risk amount in USDT
-        risk_amount_usdt = equity_usdt * risk_pct
-        
-        # Calculate price difference (risk per unit)
-        price_diff = abs(entry_price - stop_price)
-        
-        if price_diff == 0:
-            logger.error("Entry and stop prices cannot be the same")
-            return 0.0
-        
-        # Calculate position size
-        position_qty = risk_amount_usdt / price_diff
-        
-        # Round down to lot step
-        rounded_qty = math.floor(position_qty / lot_step) * lot_step
-        
-        # Ensure minimum position size
-        if rounded_qty < lot_step:
-            logger.warning(f"Calculated position size {rounded_qty} is below minimum {lot_step}")
-            return 0.0
-        
-        logger.info(f"Position size calculated: {rounded_qty:.6f} (risk: ${risk_amount_usdt:.2f})")
-        return rounded_qty
-        
-    except Exception as e:
-        logger.error(f"Error calculating position size: {e}")
+    # Risk per unit; positive only when the stop is on the losing side of entry
+    price_diff = (entry_price - stop_price) if side == 'long' else (stop_price - entry_price)
+    
+    # One combined check; comparisons with NaN are False, so NaN inputs fail it too
+    if not (equity_usdt > 0 and entry_price > 0 and stop_price > 0 and 0 < risk_pct <= 1
+            and lot_step > 0 and price_diff > 0):
+        logger.error("Invalid position size inputs: equity=%s entry=%s stop=%s risk_pct=%s lot_step=%s side=%s",
+                     equity_usdt, entry_price, stop_price, risk_pct, lot_step, side)
+        return 0.0
+    
+    rounded_qty = _position_size_core(equity_usdt, price_diff, risk_pct, lot_step)
+    
+    # Ensure minimum position size
+    if rounded_qty < lot_step:
+        logger.warning("Calculated position size is below minimum %s", lot_step)
         return 0.0
+    
+    return rounded_qty
+
+
+def position_size_batch(equity_usdt, entry_price, stop_price, risk_pct, lot_step,
+                        side: Literal['long', 'short'] = 'long') -> np.ndarray:
+    """
+    Vectorised position_size for backtests: sizes many trades at once
+    
+    Arguments are scalars or NumPy arrays that broadcast together. Rows with
+    invalid inputs (non-positive prices, equity or lot step, risk outside
+    (0, 1], stop not on the losing side of entry) or a size below one lot
+    step get 0.
+    
+    Returns:
+        np.ndarray: Position quantities rounded down to lot_step
+    """
+    equity = np.asarray(equity_usdt, dtype=np.float64)
+    entry = np.asarray(entry_price, dtype=np.float64)
+    stop = np.asarray(stop_price, dtype=np.float64)
+    risk = np.asarray(risk_pct, dtype=np.float64)
+    step = np.asarray(lot_step, dtype=np.float64)
+    
+    price_diff = (entry - stop) if side == 'long' else (stop - entry)
+    valid = ((equity > 0) & (entry > 0) & (stop > 0) & (risk > 0) & (risk <= 1)
+             & (step > 0) & (price_diff > 0))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_step = 1.0 / step
+        qty = np.floor(equity * risk / price_diff * inv_step + LOT_TICK_TOLERANCE) / inv_step
+    
+    return np.where(valid & (qty >= step), qty, 0.0)
+
+
+def signal_quality_multiplier_batch(signal_quality) -> np.ndarray:
+    """
+    Vectorised signal-quality position multiplier, as in RiskManager.calculate_position_size
+    
+    Args:
+        signal_quality: Scalar or array of signal qualities (0-100)
+    
+    Returns:
+        np.ndarray: Multiplier per element (0.7, 1.0 or 1.2)
+    """
+    q = np.asarray(signal_quality)
+    band = (q >= SIGNAL_QUALITY_BINS[0]).astype(np.intp) + (q >= SIGNAL_QUALITY_BINS[1])
+    return _SQ_MULS[band]
 
 
 def daily_guardrails(trades_today: int, pnl_today: float, stop_pct: float, 
@@ -90,47 +198,57 @@ def daily_guardrails(trades_today: int, pnl_today: float, stop_pct: float,
     Returns:
         bool: True if trading should continue, False if stopped
     """
-    try:
-        # Validate inputs
-        if trades_today < 0:
-            logger.error("Trades count cannot be negative")
-            return False
-        
-        if start_equity <= 0:
-            logger.error("Start equity must be positive")
-            return False
-        
-        if stop_pct <= 0 or stop_pct > 1:
-            logger.error("Stop percentage must be between 0 and 1")
-            return False
-        
-        # Calculate daily loss limit
-        daily_loss_limit = start_equity * stop_pct
-        
-        logger.info(f"Daily guardrails check: trades_today={trades_today}, pnl_today=${pnl_today:.2f}, start_equity=${start_equity:.2f}, daily_loss_limit=${daily_loss_limit:.2f}")
-        
-        # Check if daily loss limit exceeded
-        if pnl_today < -daily_loss_limit:
-            logger.warning(f"Daily loss limit exceeded: P&L ${pnl_today:.2f}, limit ${-daily_loss_limit:.2f}")
-            return False
-        
-        # Check if too many trades today (optional safety measure)
-        max_trades_per_day = 20  # Configurable
-        if trades_today >= max_trades_per_day:
-            logger.warning(f"Maximum trades per day reached: {trades_today}")
-            return False
-        
-        logger.info(f"Daily guardrails passed: trades={trades_today}, pnl=${pnl_today:.2f}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error checking daily guardrails: {e}")
+    # Validate inputs in one combined check (NaN fails it too)
+    if not (trades_today >= 0 and start_equity > 0 and 0 < stop_pct <= 1):
+        logger.error("Invalid guardrail inputs: trades_today=%s start_equity=%s stop_pct=%s",
+                     trades_today, start_equity, stop_pct)
+        return False
+    
+    # Calculate daily loss limit
+    daily_loss_limit = start_equity * stop_pct
+    
+    # Check if daily loss limit exceeded
+    if pnl_today < -daily_loss_limit:
+        logger.warning("Daily loss limit exceeded: P&L $%.2f, limit $%.2f", pnl_today, -daily_loss_limit)
+        return False
+    
+    # Check if too many trades today (optional safety measure)
+    if trades_today >= MAX_TRADES_PER_DAY:
+        logger.warning("Maximum trades per day reached: %d", trades_today)
         return False
+    
+    return True
+
+
+def daily_guardrails_batch(trades_today, pnl_today, stop_pct, start_equity) -> np.ndarray:
+    """
+    Vectorised daily_guardrails for a portfolio of symbols, without logging
+    
+    Arguments are NumPy arrays (or scalars) that broadcast together, one
+    element per symbol.
+    
+    Returns:
+        np.ndarray: Boolean mask, True where trading may continue
+    """
+    trades = np.asarray(trades_today)
+    pnl = np.asarray(pnl_today, dtype=np.float64)
+    stop = np.asarray(stop_pct, dtype=np.float64)
+    start = np.asarray(start_equity, dtype=np.float64)
+    
+    return ((trades >= 0) & (start > 0) & (stop > 0) & (stop <= 1)
+            & (pnl >= -(start * stop)) & (trades < MAX_TRADES_PER_DAY))
 
 
-@dataclass
 class CooldownTracker:
-    """Track cooldown periods between trades"""
+    """
+    Track cooldown periods between trades
+    
+    Bars are monotonic integer tick counts (the bot's closed-bar counter, or
+    the bar index in a backtest), never wall-clock times, so the cooldown is
+    a plain int subtraction.
+    """
+    
+    __slots__ = ('cooldown_bars', 'last_close_bar', 'bars_since_close', 'is_in_cooldown')
     
     def __init__(self, cooldown_bars: int = 1):
         self.cooldown_bars = cooldown_bars
@@ -143,44 +261,23 @@ class CooldownTracker:
         Update cooldown tracker with current bar
         
         Args:
-            current_bar: Current bar number/timestamp
+            current_bar: Monotonic bar index
         """
-        try:
-            if self.last_close_bar is not None:
-                self.bars_since_close = current_bar - self.last_close_bar
-            else:
-                # If no trade has been closed yet, we're not in cooldown
-                self.bars_since_close = self.cooldown_bars
-                self.is_in_cooldown = False
-                logger.info(f"Cooldown: No previous trades, allowing trading")
-                return
-            
-            # Check if cooldown period has passed
-            if self.bars_since_close >= self.cooldown_bars:
-                self.is_in_cooldown = False
-            else:
-                self.is_in_cooldown = True
-                
-            logger.info(f"Cooldown: bars_since_close={self.bars_since_close}, in_cooldown={self.is_in_cooldown}")
-            
-        except Exception as e:
-            logger.error(f"Error updating cooldown tracker: {e}")
+        # No close yet counts as a full cooldown already elapsed
+        last_close_bar = self.last_close_bar
+        self.bars_since_close = (current_bar - last_close_bar) if last_close_bar is not None else self.cooldown_bars
+        self.is_in_cooldown = self.bars_since_close < self.cooldown_bars
     
     def record_trade_close(self, current_bar: int) -> None:
         """
         Record when a trade is closed
         
         Args:
-            current_bar: Current bar number/timestamp
+            current_bar: Monotonic bar index
         """
-        try:
-            self.last_close_bar = current_bar
-            self.bars_since_close = 0
-            self.is_in_cooldown = True
-            logger.info(f"Trade closed, cooldown started at bar {current_bar}")
-            
-        except Exception as e:
-            logger.error(f"Error recording trade close: {e}")
+        self.last_close_bar = current_bar
+        self.bars_since_close = 0
+        self.is_in_cooldown = True
     
     def can_trade(self) -> bool:
         """
@@ -191,37 +288,66 @@ class CooldownTracker:
         """
         return not self.is_in_cooldown
     
-    def get_cooldown_status(self) -> Dict:
+    def get_cooldown_status(self) -> CooldownStatus:
         """
         Get current cooldown status
         
         Returns:
-            dict: Cooldown status information
+            CooldownStatus: Cooldown status information
         """
-        return {
-            'is_in_cooldown': self.is_in_cooldown,
-            'bars_since_close': self.bars_since_close,
-            'cooldown_bars': self.cooldown_bars,
-            'last_close_bar': self.last_close_bar
-        }
+        return CooldownStatus(self.is_in_cooldown, self.bars_since_close, self.cooldown_bars, self.last_close_bar)
+
+
+def _risk_multiplier(win_rate: float, recent_performance: float, win_rate_threshold: float) -> float:
+    """Risk multiplier for the recent win rate and last-5-trade return (fraction of equity)"""
+    if win_rate < win_rate_threshold:
+        return 0.5  # Poor performance - reduce risk
+    if recent_performance < -0.05:
+        return 0.7  # Recent losses (>5%) - reduce risk
+    if win_rate > 0.6 and recent_performance > 0.02:
+        return 1.2  # Good performance - can increase risk slightly
+    return 1.0
+
+
+def _make_lot_rounder(lot_step: float):
+    """Build a function that rounds a quantity down to whole lot_step units"""
+    # The inverse step is bound as a default so each call reads a local, not an attribute
+    def _round_lots(qty: float, _inv: float = 1.0 / lot_step) -> float:
+        return int(qty * _inv + LOT_TICK_TOLERANCE) / _inv
+    return _round_lots
 
 
 class RiskManager:
     """Enhanced risk management with loss analysis insights"""
     
+    __slots__ = (
+        'initial_equity', 'current_equity', 'risk_per_trade_pct', 'daily_loss_stop_pct', 'cooldown_bars',
+        'max_consecutive_losses', 'consecutive_loss_count', 'consecutive_loss_cooldown_hours', '_last_loss_ts',
+        'base_risk_pct', 'risk_multiplier', 'min_risk_pct', 'max_risk_pct',
+        'max_recent_trades', 'win_rate_threshold', '_pnl', '_count', '_head', '_win_count',
+        '_daily_pnl', '_daily_date', '_worst_hours', '_worst_days', '_summary_cache',
+        '_equity_loss_limit', '_max_position_value', '_risk_amount_base',
+        '_loss_counts', 'market_volatility', 'trend_strength', 'last_signal_quality',
+        'daily_start_equity', 'trades_today', 'last_reset_date', 'cooldown_tracker',
+        '_daily_loss_limit', '_max_trades', 'lot_step', '_round_lots'
+    )
+    
     def __init__(self, initial_equity: float, risk_per_trade_pct: float = 0.01, 
-                 daily_loss_stop_pct: float = 0.05, cooldown_bars: int = 1):
+                 daily_loss_stop_pct: float = 0.05, cooldown_bars: int = 1, lot_step: float = 0.001):
         self.initial_equity = initial_equity
         self.current_equity = initial_equity
         self.risk_per_trade_pct = risk_per_trade_pct
         self.daily_loss_stop_pct = daily_loss_stop_pct
         self.cooldown_bars = cooldown_bars
+        self.cooldown_tracker = CooldownTracker(cooldown_bars)
+        self.lot_step = lot_step
+        self._round_lots = _make_lot_rounder(lot_step)
         
         # NEW: Enhanced risk management based on loss analysis
         self.max_consecutive_losses = 3  # Stop after 3 consecutive losses
         self.consecutive_loss_count = 0
         self.consecutive_loss_cooldown_hours = 24
-        self.last_loss_time = None
+        self._last_loss_ts = None  # Epoch seconds of the last losing trade
         
         # NEW: Dynamic risk adjustment
         self.base_risk_pct = risk_per_trade_pct
@@ -229,121 +355,246 @@ class RiskManager:
         self.min_risk_pct = 0.005  # Minimum 0.5% risk
         self.max_risk_pct = 0.015  # Maximum 1.5% risk
         
-        # NEW: Performance tracking
-        self.recent_trades = []  # Last 20 trades
+        # NEW: Performance tracking - P&L of the last 20 trades as a ring buffer
         self.max_recent_trades = 20
+        self._pnl = np.zeros(self.max_recent_trades, np.float64)
+        self._count = 0  # Trades held, at most max_recent_trades
+        self._head = 0  # Next slot to write
+        self._win_count = 0  # Winning trades among those held
+        self._daily_pnl = 0.0  # Realised P&L of trades recorded today
+        self._daily_date = date.today()
         self.win_rate_threshold = 0.4  # 40% minimum win rate
         
-        # NEW: Loss pattern analysis
-        self.loss_patterns = {
-            'stop_loss_hits': 0,
-            'large_losses': 0,  # >2% loss
-            'quick_losses': 0,  # <1 hour
-            'worst_hours': [6, 7, 8, 9, 10, 11],  # 06:00-12:00
-            'worst_days': ['Sunday']
-        }
+        # NEW: Loss pattern analysis (counters indexed by LossCat, see loss_patterns)
+        self._loss_counts = np.zeros(len(LossCat), np.int64)
+        self._worst_hours = frozenset(range(6, 12))  # 06:00-12:00
+        self._worst_days = frozenset({'Sunday'})
         
         # NEW: Market condition tracking
         self.market_volatility = 0.0
         self.trend_strength = 0.0
         self.last_signal_quality = 0.0
         
+        # Daily tracking, rolled over by reset_daily_tracking()
+        self.daily_start_equity = initial_equity
+        self.trades_today = 0
+        self.last_reset_date = date.today()
+        self._daily_loss_limit = initial_equity * daily_loss_stop_pct  # Recomputed when the day resets
+        self._max_trades = MAX_TRADES_PER_DAY
+        self._summary_cache = None  # get_risk_summary() snapshot, cleared when risk state changes
+        self._refresh_equity_limits()
+        
         logger.info(f"Risk manager initialized: equity=${initial_equity:.2f}, risk={risk_per_trade_pct*100}%, daily_stop={daily_loss_stop_pct*100}%")
         logger.info(f"Enhanced features: max_consecutive_losses={self.max_consecutive_losses}, cooldown={self.consecutive_loss_cooldown_hours}h")
 
     def update_equity(self, new_equity: float):
         """Update current equity and recalculate risk parameters"""
         self.current_equity = new_equity
+        self._summary_cache = None
         self._adjust_risk_parameters()
+        self._refresh_equity_limits()
+
+    def initialize_with_real_equity(self, equity: float):
+        """Start tracking from the real account equity instead of the configured initial equity"""
+        self.initial_equity = equity
+        self.current_equity = equity
+        self._summary_cache = None
+        self.daily_start_equity = equity
+        self._daily_loss_limit = equity * self.daily_loss_stop_pct
+        self._refresh_equity_limits()
+
+    def set_daily_loss_stop_pct(self, daily_loss_stop_pct: float):
+        """Change the daily loss stop (0.01 = 1%) and today's loss limit with it"""
+        self.daily_loss_stop_pct = daily_loss_stop_pct
+        self._daily_loss_limit = self.daily_start_equity * daily_loss_stop_pct
+        self._refresh_equity_limits()
+
+    def _refresh_equity_limits(self) -> None:
+        """Recompute the limits derived from current equity; call whenever equity or risk changes"""
+        self._equity_loss_limit = -(self.current_equity * self.daily_loss_stop_pct)
+        self._max_position_value = self.current_equity * 0.15  # Max 15% of equity
+        self._risk_amount_base = self.current_equity * self.risk_per_trade_pct
+
+    def reset_daily_tracking(self, today: Optional[date] = None) -> None:
+        """
+        Start a new trading day if the date has changed
+        
+        Args:
+            today: Date of the current bar; defaults to date.today(). Backtests
+                pass the bar's date so replayed days roll over correctly.
+        """
+        if today is None:
+            today = date.today()
+        if today != self.last_reset_date:
+            self.reset_daily_tracking_now(today)
+
+    def reset_daily_tracking_now(self, today: Optional[date] = None) -> None:
+        """Reset the daily trade count and start-of-day equity unconditionally"""
+        self.last_reset_date = today or date.today()
+        self.daily_start_equity = self.current_equity
+        self._daily_loss_limit = self.current_equity * self.daily_loss_stop_pct
+        self.trades_today = 0
+        logger.info("Daily tracking reset: start equity $%.2f", self.daily_start_equity)
+
+    def increment_trades_today(self, today: Optional[date] = None) -> None:
+        """Count a newly opened trade against today's total"""
+        self.reset_daily_tracking(today)
+        self.trades_today += 1
+
+    @property
+    def last_loss_time(self) -> Optional[datetime]:
+        """Local time of the last losing trade, None if there has been none"""
+        if self._last_loss_ts is None:
+            return None
+        return datetime.fromtimestamp(self._last_loss_ts)
+
+    @property
+    def loss_patterns(self) -> Dict:
+        """Loss counters and time filters as a dict, built on each access"""
+        counts = self._loss_counts.tolist()
+        return {
+            'stop_loss_hits': counts[LossCat.STOP],
+            'large_losses': counts[LossCat.LARGE],
+            'quick_losses': counts[LossCat.QUICK],
+            'worst_hours': sorted(self._worst_hours),
+            'worst_days': sorted(self._worst_days)
+        }
 
     def _adjust_risk_parameters(self):
         """Dynamically adjust risk parameters based on performance"""
-        if len(self.recent_trades) < 5:
+        if self._count < 5:
             return  # Need more data
         
         # Calculate current win rate
-        wins = sum(1 for trade in self.recent_trades if trade.get('pnl', 0) > 0)
-        win_rate = wins / len(self.recent_trades)
+        win_rate = self._calculate_win_rate()
         
         # Calculate recent performance
-        recent_pnl = sum(trade.get('pnl', 0) for trade in self.recent_trades[-5:])
+        recent_pnl = float(self._last_pnl(5).sum())
         recent_performance = recent_pnl / self.initial_equity
         
         # Adjust risk based on performance
-        if win_rate < self.win_rate_threshold:
-            # Poor performance - reduce risk
-            self.risk_multiplier = 0.5
-            logger.warning(f"Low win rate ({win_rate:.1%}) - reducing risk to {self.risk_multiplier}x")
-        elif recent_performance < -0.05:  # 5% recent loss
-            # Recent losses - reduce risk
-            self.risk_multiplier = 0.7
-            logger.warning(f"Recent losses ({recent_performance:.1%}) - reducing risk to {self.risk_multiplier}x")
-        elif win_rate > 0.6 and recent_performance > 0.02:
-            # Good performance - can increase risk slightly
-            self.risk_multiplier = 1.2
-            logger.info(f"Good performance (win_rate={win_rate:.1%}, recent={recent_performance:.1%}) - increasing risk to {self.risk_multiplier}x")
-        else:
-            # Normal performance - standard risk
-            self.risk_multiplier = 1.0
+        mult = self.risk_multiplier = _risk_multiplier(win_rate, recent_performance, self.win_rate_threshold)
+        if mult == 0.5:
+            logger.warning("Low win rate (%.1f%%) - reducing risk to %sx", win_rate * 100, mult)
+        elif mult == 0.7:
+            logger.warning("Recent losses (%.1f%%) - reducing risk to %sx", recent_performance * 100, mult)
+        elif mult == 1.2:
+            logger.info("Good performance (win_rate=%.1f%%, recent=%.1f%%) - increasing risk to %sx",
+                        win_rate * 100, recent_performance * 100, mult)
         
         # Apply risk multiplier
-        adjusted_risk = self.base_risk_pct * self.risk_multiplier
-        self.risk_per_trade_pct = max(self.min_risk_pct, min(adjusted_risk, self.max_risk_pct))
+        self.risk_per_trade_pct = max(self.min_risk_pct, min(self.base_risk_pct * mult, self.max_risk_pct))
+        self._refresh_equity_limits()
 
-    def can_trade(self, signal_quality: float = 0.0, market_conditions: dict = None) -> tuple[bool, str]:
-        """Enhanced trade permission check with multiple filters"""
+    def can_trade(self, signal_quality: float = 0.0, market_conditions: dict = None,
+                  now: Optional[datetime] = None) -> tuple[bool, BlockReason, Dict]:
+        """
+        Enhanced trade permission check with multiple filters
+        
+        Args:
+            signal_quality: Signal strength (0-100)
+            market_conditions: Optional dict with high_volatility / low_volume flags
+            now: Current time; defaults to datetime.now()
+        
+        Returns:
+            tuple: (allowed, BlockReason, context dict); pass the last two to
+                reason_str() for a message. The context is empty when allowed.
+        """
+        if now is None:
+            now = datetime.now()
         
         # NEW: Check consecutive loss limit
         if self.consecutive_loss_count >= self.max_consecutive_losses:
-            if self.last_loss_time:
-                hours_since_loss = (datetime.now() - self.last_loss_time).total_seconds() / 3600
+            if self._last_loss_ts is not None:
+                hours_since_loss = (now.timestamp() - self._last_loss_ts) / 3600.0
                 if hours_since_loss < self.consecutive_loss_cooldown_hours:
                     remaining = self.consecutive_loss_cooldown_hours - hours_since_loss
-                    return False, f"Max consecutive losses ({self.max_consecutive_losses}) reached. Cooldown: {remaining:.1f}h remaining"
+                    return False, BlockReason.CONSECUTIVE_LOSSES, {'max_losses': self.max_consecutive_losses,
+                                                                    'remaining': remaining}
                 else:
                     # Reset after cooldown
                     self.consecutive_loss_count = 0
+                    self._summary_cache = None
                     logger.info("Consecutive loss cooldown completed - resuming trading")
             else:
-                return False, f"Max consecutive losses ({self.max_consecutive_losses}) reached. Cooldown active"
+                return False, BlockReason.CONSECUTIVE_LOSSES, {'max_losses': self.max_consecutive_losses}
         
         # NEW: Check signal quality
         if signal_quality < 50:  # Signal strength below 50%
-            return False, f"Signal quality too low: {signal_quality:.1f}% (minimum 50%)"
+            return False, BlockReason.SIGNAL_LOW, {'signal_quality': signal_quality}
         
         # NEW: Check market conditions
         if market_conditions:
             if market_conditions.get('high_volatility', False):
-                return False, "Market volatility too high - avoid trading"
+                return False, BlockReason.HIGH_VOL, {}
             if market_conditions.get('low_volume', False):
-                return False, "Market volume too low - avoid trading"
+                return False, BlockReason.LOW_VOLUME, {}
         
         # NEW: Check time-based filters (from loss analysis)
-        current_hour = datetime.now().hour
-        if current_hour in self.loss_patterns['worst_hours']:
-            return False, f"Trading hour {current_hour}:00 in worst performing period (06:00-12:00)"
+        current_hour = now.hour
+        if current_hour in self._worst_hours:
+            return False, BlockReason.WORST_HOUR, {'hour': current_hour}
         
-        current_day = datetime.now().strftime('%A')
-        if current_day in self.loss_patterns['worst_days']:
-            return False, f"Trading day {current_day} in worst performing period"
+        current_day = WEEKDAY_NAMES[now.weekday()]
+        if current_day in self._worst_days:
+            return False, BlockReason.WORST_DAY, {'day': current_day}
         
         # Standard checks
         if self.current_equity <= 0:
-            return False, "Insufficient equity"
+            return False, BlockReason.NO_EQUITY, {}
         
         # Check daily loss limit
         daily_pnl = self._calculate_daily_pnl()
-        if daily_pnl < -(self.current_equity * self.daily_loss_stop_pct):
-            return False, f"Daily loss limit reached: ${daily_pnl:.2f}"
+        if daily_pnl < self._equity_loss_limit:
+            return False, BlockReason.DAILY_STOP, {'daily_pnl': daily_pnl}
+        
+        return True, BlockReason.OK, {}
+
+    def can_open_trade(self, current_bar: int) -> bool:
+        """
+        Per-bar entry check: bar cooldown after the last close, then daily guardrails
+        
+        Args:
+            current_bar: Current bar number
         
-        return True, "Trading allowed"
+        Returns:
+            bool: True if a new trade may be opened
+        """
+        self.cooldown_tracker.update_bar(current_bar)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Cooldown status: %s", self.cooldown_tracker.get_cooldown_status())
+        if not self.cooldown_tracker.can_trade():
+            return False
+        
+        # Daily guardrails against the loss limit cached at the start of the day
+        self.reset_daily_tracking()
+        today_pnl = self.current_equity - self.daily_start_equity
+        if today_pnl < -self._daily_loss_limit:
+            logger.warning("Daily loss limit exceeded: P&L $%.2f, limit $%.2f", today_pnl, -self._daily_loss_limit)
+            return False
+        if self.trades_today >= self._max_trades:
+            logger.warning("Maximum trades per day reached: %d", self.trades_today)
+            return False
+        return True
+
+    def record_trade_close(self, current_bar: int) -> None:
+        """Start the bar cooldown after a trade closes"""
+        self.cooldown_tracker.record_trade_close(current_bar)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Trade closed, cooldown started at bar %d", current_bar)
+
+    def set_lot_step(self, lot_step: float) -> None:
+        """Set the symbol's lot step (exchange LOT_SIZE stepSize) used to round sizes"""
+        if lot_step > 0 and lot_step != self.lot_step:
+            self.lot_step = lot_step
+            self._round_lots = _make_lot_rounder(lot_step)
 
     def calculate_position_size(self, entry_price: float, stop_loss: float, 
                               signal_quality: float = 0.0) -> float:
         """Enhanced position sizing with signal quality consideration"""
         
         # Calculate base position size
-        risk_amount = self.current_equity * self.risk_per_trade_pct
+        risk_amount = self._risk_amount_base
         price_difference = abs(entry_price - stop_loss)
         
         if price_difference <= 0:
@@ -352,72 +603,85 @@ class RiskManager:
         
         base_position_size = risk_amount / price_difference
         
-        # NEW: Adjust position size based on signal quality
-        if signal_quality >= 80:
-            # High quality signal - can increase position
-            position_multiplier = 1.2
-            logger.info(f"High signal quality ({signal_quality:.1f}%) - increasing position size by 20%")
-        elif signal_quality >= 60:
-            # Medium quality signal - standard position
-            position_multiplier = 1.0
-        else:
-            # Low quality signal - reduce position
-            position_multiplier = 0.7
-            logger.warning(f"Low signal quality ({signal_quality:.1f}%) - reducing position size by 30%")
+        # NEW: Adjust position size based on signal quality (table lookup, see SIGNAL_QUALITY_BINS)
+        # Band = number of thresholds reached; NaN reaches none, as before. int() keeps
+        # np.float64 qualities from adding np.bool_ values, which would be a logical OR
+        quality_band = int(signal_quality >= SIGNAL_QUALITY_BINS[0]) + int(signal_quality >= SIGNAL_QUALITY_BINS[1])
+        position_multiplier = SIGNAL_QUALITY_MULTIPLIERS[quality_band]
+        if quality_band == 2:
+            logger.info("High signal quality (%.1f%%) - increasing position size by 20%%", signal_quality)
+        elif quality_band == 0:
+            logger.warning("Low signal quality (%.1f%%) - reducing position size by 30%%", signal_quality)
         
         # NEW: Adjust position size based on recent performance
-        if len(self.recent_trades) >= 3:
-            recent_losses = sum(1 for trade in self.recent_trades[-3:] if trade.get('pnl', 0) < 0)
+        if self._count >= 3:
+            recent_losses = int((self._last_pnl(3) < 0).sum())
             if recent_losses >= 2:
                 position_multiplier *= 0.5  # Reduce position after recent losses
-                logger.warning(f"Recent losses detected - reducing position size by 50%")
+                logger.warning("Recent losses detected - reducing position size by 50%")
         
         adjusted_position_size = base_position_size * position_multiplier
         
         # NEW: Ensure position size is within limits
-        max_position_value = self.current_equity * 0.15  # Max 15% of equity
+        max_position_value = self._max_position_value
         min_position_value = 1.0  # Min $1 position
         
         position_value = adjusted_position_size * entry_price
         if position_value > max_position_value:
             adjusted_position_size = max_position_value / entry_price
-            logger.info(f"Position size capped at 15% of equity: ${max_position_value:.2f}")
+            logger.info("Position size capped at 15%% of equity: $%.2f", max_position_value)
         elif position_value < min_position_value:
             adjusted_position_size = min_position_value / entry_price
-            logger.info(f"Position size increased to minimum: ${min_position_value:.2f}")
+            logger.info("Position size increased to minimum: $%.2f", min_position_value)
         
-        logger.info(f"Position size: {adjusted_position_size:.4f} (${adjusted_position_size * entry_price:.2f})")
+        # Round down to whole lot steps
+        adjusted_position_size = self._round_lots(adjusted_position_size)
+        if adjusted_position_size <= 0:
+            logger.warning("Position size is below one lot step (%s)", self.lot_step)
+            return 0.0
+        
+        logger.info("Position size: %.4f ($%.2f)", adjusted_position_size, adjusted_position_size * entry_price)
         return adjusted_position_size
 
     def record_trade_result(self, trade_result: dict):
         """Record trade result and update risk parameters"""
         
-        # Add to recent trades
-        self.recent_trades.append(trade_result)
-        if len(self.recent_trades) > self.max_recent_trades:
-            self.recent_trades.pop(0)
+        self._summary_cache = None
         
-        # Update consecutive loss count
+        # Add to recent trades, overwriting the oldest once the buffer is full
         pnl = trade_result.get('pnl', 0)
+        slot = self._head
+        if self._count == self.max_recent_trades and self._pnl[slot] > 0:
+            self._win_count -= 1  # Evicting a win
+        if pnl > 0:
+            self._win_count += 1
+        self._pnl[slot] = pnl
+        self._head = (slot + 1) % self.max_recent_trades
+        self._count = min(self._count + 1, self.max_recent_trades)
+        self._calculate_daily_pnl()  # Rolls the accumulator over if the date changed
+        self._daily_pnl += pnl
+        
+        # Update consecutive loss count
         if pnl < 0:
             self.consecutive_loss_count += 1
-            self.last_loss_time = datetime.now()
+            self._last_loss_ts = time.time()
             
             # NEW: Update loss pattern analysis
-            self.loss_patterns['stop_loss_hits'] += 1
+            counts = self._loss_counts
+            counts[LossCat.STOP] += 1
             
             loss_pct = abs(trade_result.get('pnl_pct', 0))
             if loss_pct > 0.02:  # >2% loss
-                self.loss_patterns['large_losses'] += 1
+                counts[LossCat.LARGE] += 1
             
             duration = trade_result.get('duration_hours', 0)
             if duration < 1:  # <1 hour
-                self.loss_patterns['quick_losses'] += 1
+                counts[LossCat.QUICK] += 1
             
-            logger.warning(f"Trade loss recorded. Consecutive losses: {self.consecutive_loss_count}/{self.max_consecutive_losses}")
+            logger.warning("Trade loss recorded. Consecutive losses: %s/%s", self.consecutive_loss_count, self.max_consecutive_losses)
             
             # NEW: Implement emergency stop if too many large losses
-            if self.loss_patterns['large_losses'] >= 3:
+            if counts[LossCat.LARGE] >= 3:
                 logger.error("Too many large losses detected - implementing emergency stop")
                 self.consecutive_loss_count = self.max_consecutive_losses
         else:
@@ -429,76 +693,167 @@ class RiskManager:
         self._adjust_risk_parameters()
         
         # NEW: Log risk status
-        logger.info(f"Risk status: consecutive_losses={self.consecutive_loss_count}, risk_pct={self.risk_per_trade_pct*100:.2f}%, risk_multiplier={self.risk_multiplier:.2f}")
+        logger.info("Risk status: consecutive_losses=%s, risk_pct=%.2f%%, risk_multiplier=%.2f",
+                    self.consecutive_loss_count, self.risk_per_trade_pct * 100, self.risk_multiplier)
 
-    def get_risk_summary(self) -> dict:
-        """Get comprehensive risk summary"""
-        return {
-            'current_equity': self.current_equity,
-            'risk_per_trade_pct': self.risk_per_trade_pct,
-            'consecutive_losses': self.consecutive_loss_count,
-            'max_consecutive_losses': self.max_consecutive_losses,
-            'risk_multiplier': self.risk_multiplier,
-            'recent_trades_count': len(self.recent_trades),
-            'win_rate': self._calculate_win_rate(),
-            'loss_patterns': self.loss_patterns.copy(),
-            'can_trade': self.can_trade()[0]
-        }
+    def get_risk_summary(self) -> RiskSummary:
+        """
+        Get comprehensive risk summary (use ._asdict() for a dict)
+        
+        Everything except can_trade is cached until the equity or a trade result
+        changes, so loss_patterns may be shared between calls; treat it as read-only.
+        """
+        # Evaluated first and on every call: it depends on the clock and may end a loss cooldown
+        allowed = self.can_trade()[0]
+        if self._summary_cache is None:
+            self._summary_cache = RiskSummary(
+                current_equity=self.current_equity,
+                risk_per_trade_pct=self.risk_per_trade_pct,
+                consecutive_losses=self.consecutive_loss_count,
+                max_consecutive_losses=self.max_consecutive_losses,
+                risk_multiplier=self.risk_multiplier,
+                recent_trades_count=self._count,
+                win_rate=self._calculate_win_rate(),
+                loss_patterns=self.loss_patterns,
+                can_trade=allowed
+            )
+        return self._summary_cache._replace(can_trade=allowed)
+
+    def _last_pnl(self, k: int) -> np.ndarray:
+        """P&L of the last k recorded trades, oldest first (k <= trades held)"""
+        # Indices before slot 0 wrap to the end of the ring
+        return self._pnl.take(np.arange(self._head - k, self._head), mode='wrap')
 
     def _calculate_win_rate(self) -> float:
         """Calculate current win rate"""
-        if not self.recent_trades:
+        if not self._count:
             return 0.0
-        wins = sum(1 for trade in self.recent_trades if trade.get('pnl', 0) > 0)
-        return wins / len(self.recent_trades)
+        return self._win_count / self._count
 
     def _calculate_daily_pnl(self) -> float:
-        """Calculate today's P&L"""
-        today = datetime.now().date()
-        daily_pnl = 0.0
+        """Today's realised P&L, kept up to date by record_trade_result()"""
+        today = date.today()
+        if today != self._daily_date:
+            self._daily_pnl = 0.0
+            self._daily_date = today
+        return self._daily_pnl
+
+
+class PortfolioRisk:
+    """Daily tracking and cooldowns for many symbols, one array element per symbol_id"""
+    
+    __slots__ = ('n_symbols', 'daily_loss_stop_pct', 'cooldown_bars', 'current_equity', 'daily_start_equity',
+                 'trades_today', 'last_close_bar', 'bars_since_close', 'is_in_cooldown', 'last_reset_date')
+    
+    def __init__(self, n_symbols: int, start_equity, daily_loss_stop_pct: float = 0.05, cooldown_bars: int = 1):
+        """
+        Args:
+            n_symbols: Number of symbols; symbol_id runs from 0 to n_symbols - 1
+            start_equity: Starting equity per symbol (scalar or array)
+            daily_loss_stop_pct: Daily loss stop percentage (0.01 = 1%)
+            cooldown_bars: Bars to wait after a close before a symbol may trade again
+        """
+        self.n_symbols = n_symbols
+        self.daily_loss_stop_pct = daily_loss_stop_pct
+        self.cooldown_bars = cooldown_bars
         
-        for trade in self.recent_trades:
-            trade_date = trade.get('exit_time', datetime.now()).date()
-            if trade_date == today:
-                daily_pnl += trade.get('pnl', 0)
+        self.current_equity = np.full(n_symbols, start_equity, dtype=np.float64)
+        self.daily_start_equity = self.current_equity.copy()
+        # Narrow dtypes keep the per-bar sweep small: trades per day are capped at
+        # MAX_TRADES_PER_DAY, well inside int8
+        self.trades_today = np.zeros(n_symbols, dtype=np.int8)
+        self.last_close_bar = np.full(n_symbols, -1, dtype=np.int64)  # -1: no trade closed yet
+        self.bars_since_close = np.full(n_symbols, cooldown_bars, dtype=np.int32)
+        self.is_in_cooldown = np.zeros(n_symbols, dtype=np.bool_)
+        self.last_reset_date = date.today()
+    
+    @property
+    def today_pnl(self) -> np.ndarray:
+        """Today's P&L per symbol"""
+        return self.current_equity - self.daily_start_equity
+    
+    def update_equity(self, symbol_id: int, equity: float) -> None:
+        """Record a symbol's current equity"""
+        self.current_equity[symbol_id] = equity
+    
+    def increment_trades_today(self, symbol_id: int, today: Optional[date] = None) -> None:
+        """Count a newly opened trade for a symbol"""
+        self.reset_daily_tracking(today)
+        if self.trades_today[symbol_id] < np.iinfo(np.int8).max:
+            self.trades_today[symbol_id] += 1
+    
+    def record_trade_close(self, symbol_id: int, current_bar: int) -> None:
+        """Start a symbol's bar cooldown"""
+        self.last_close_bar[symbol_id] = current_bar
+        self.bars_since_close[symbol_id] = 0
+        self.is_in_cooldown[symbol_id] = self.cooldown_bars > 0
+    
+    def reset_daily_tracking(self, today: Optional[date] = None) -> None:
+        """Start a new trading day for every symbol if the date has changed"""
+        if today is None:
+            today = date.today()
+        if today != self.last_reset_date:
+            self.last_reset_date = today
+            self.daily_start_equity[:] = self.current_equity
+            self.trades_today[:] = 0
+    
+    def update_bars(self, current_bar: int) -> np.ndarray:
+        """
+        Advance every symbol's cooldown to current_bar
         
-        return daily_pnl
+        Returns:
+            np.ndarray: Boolean mask, True where the symbol is out of cooldown
+        """
+        closed = self.last_close_bar >= 0
+        self.bars_since_close[closed] = current_bar - self.last_close_bar[closed]
+        np.less(self.bars_since_close, self.cooldown_bars, out=self.is_in_cooldown)
+        return ~self.is_in_cooldown
+    
+    def check_all_guardrails(self) -> np.ndarray:
+        """Boolean mask of symbols within their daily loss limit and trade cap"""
+        self.reset_daily_tracking()
+        return daily_guardrails_batch(self.trades_today, self.today_pnl,
+                                      self.daily_loss_stop_pct, self.daily_start_equity)
+    
+    def can_open_trades(self, current_bar: int) -> np.ndarray:
+        """Boolean mask of symbols that may open a trade on current_bar"""
+        return self.update_bars(current_bar) & self.check_all_guardrails()
+
+
+@lru_cache(maxsize=RISK_CACHE_SIZE)
+def _rr_core(entry_price: float, stop_price: float, target_price: float, is_long: bool) -> float:
+    """Reward / risk, 0.0 unless the stop is on the losing side of entry"""
+    if is_long:
+        risk = entry_price - stop_price
+        reward = target_price - entry_price
+    else:
+        risk = stop_price - entry_price
+        reward = entry_price - target_price
+    return reward / risk if risk > 0 else 0.0
+
+
+@lru_cache(maxsize=RISK_CACHE_SIZE)
+def _max_pos_core(equity: float, max_risk_pct: float, entry_price: float) -> float:
+    """Quantity worth equity * max_risk_pct at entry_price"""
+    return equity * max_risk_pct / entry_price
 
 
 # Legacy functions for backward compatibility
 def calculate_risk_reward_ratio(entry_price: float, stop_price: float, 
-                               target_price: float) -> float:
+                               target_price: float, side: Literal['long', 'short'] = 'long') -> float:
     """Calculate risk-reward ratio"""
-    try:
-        risk = abs(entry_price - stop_price)
-        reward = abs(target_price - entry_price)
-        
-        if risk == 0:
-            return 0.0
-        
-        return reward / risk
-        
-    except Exception as e:
-        logger.error(f"Error calculating risk-reward ratio: {e}")
-        return 0.0
+    return _rr_core(entry_price, stop_price, target_price, side == 'long')
 
 
 def validate_position_size(qty: float, min_qty: float, max_qty: float) -> bool:
     """Validate position size within limits"""
-    try:
-        return min_qty <= qty <= max_qty
-    except Exception as e:
-        logger.error(f"Error validating position size: {e}")
-        return False
+    return min_qty <= qty <= max_qty
 
 
 def calculate_max_position_size(equity: float, max_risk_pct: float, 
                               entry_price: float) -> float:
     """Calculate maximum position size based on equity and max risk"""
-    try:
-        max_risk_amount = equity * max_risk_pct
-        max_qty = max_risk_amount / entry_price
-        return max_qty
-    except Exception as e:
-        logger.error(f"Error calculating max position size: {e}")
+    if entry_price <= 0:
+        logger.error("Invalid entry price for max position size: %s", entry_price)
         return 0.0
+    return _max_pos_core(equity, max_risk_pct, entry_price)
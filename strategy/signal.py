@@ -1,13 +1,109 @@
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Optional
-from .indicators import calculate_all_indicators, is_valid_data, get_latest_indicators
+import math
+import pytz
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Optional, Tuple
+from .indicators import (calculate_all_indicators, is_valid_data, get_latest_indicators, IndicatorState,
+                         _candle_set_key)
 
 logger = logging.getLogger(__name__)
 
+# The hour/weekday filters are read in the bot's trading timezone on every path
+try:
+    from api.app.config import settings
+    SIGNAL_TZ = pytz.timezone(settings.TZ)
+except ImportError:
+    SIGNAL_TZ = pytz.timezone("Asia/Dhaka")
 
-def generate_signal(df: pd.DataFrame) -> Dict:
+# Worst performing times from loss analysis, as bitmasks: bit h / bit weekday() set = avoid
+AVOID_HOURS_MASK = 0b1111_1100_0000  # Hours 6-11 (06:00-12:00)
+AVOID_WEEKDAYS_MASK = 1 << 6  # Sunday
+# Market condition labels indexed by (up test) - (down test): 1 -> [1], 0 -> [0], -1 -> [-1]
+_TREND_LABELS = ("sideways", "uptrend", "downtrend")
+_MOMENTUM_LABELS = ("bearish", "bullish", "overbought", "oversold")  # 2 = above 70, -1 = below 30
+_VOLATILITY_LABELS = ("medium", "high", "low")
+INDICATOR_CACHE_SIZE = 8  # Latest-indicator results kept by _latest_indicators()
+_indicator_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+
+class SignalResult(NamedTuple):
+    """
+    Result of generate_signal(); use .as_dict() for the legacy dict layout
+    
+    The indicator fields are None when no indicators were available, and
+    rejected_reasons is only filled for flat signals with DEBUG logging on.
+    """
+    signal: str  # 'long' | 'flat'
+    sl: Optional[float] = None
+    tp1: Optional[float] = None
+    entry_ref_price: Optional[float] = None
+    close: Optional[float] = None
+    ema20: Optional[float] = None
+    ema50: Optional[float] = None
+    rsi: Optional[float] = None
+    atr: Optional[float] = None
+    ema_diff_pct: Optional[float] = None
+    rejected_reasons: Tuple[str, ...] = ()
+    
+    def as_dict(self) -> Dict:
+        """Signal as the nested dict generate_signal() used to return"""
+        result = {
+            'signal': self.signal,
+            'sl': self.sl,
+            'tp1': self.tp1,
+            'entry_ref_price': self.entry_ref_price
+        }
+        if self.close is not None:
+            indicators = {
+                'close': self.close,
+                'ema20': self.ema20,
+                'ema50': self.ema50,
+                'rsi': self.rsi,
+                'atr': self.atr,
+                'ema_diff_pct': self.ema_diff_pct
+            }
+            if self.signal == 'long':
+                indicators['signal_strength'] = min(self.ema_diff_pct * 1000, 100)  # 0-100 scale
+            else:
+                indicators['rejected_reasons'] = list(self.rejected_reasons)
+            result['indicators'] = indicators
+        return result
+
+
+FLAT_SIGNAL = SignalResult('flat')  # Shared result when no signal could be evaluated
+
+
+def _latest_indicators(df: pd.DataFrame) -> Dict:
+    """
+    get_latest_indicators() memoised on the same candle-set key as calculate_all_indicators()
+    
+    The signal helpers below are often called on the same bar several times
+    per tick; only the first call pays for validation and the indicator pass.
+    Only valid data is cached, so a hit needs no is_valid_data() check, and
+    an empty dict means the data failed validation.
+    """
+    key = None
+    if {'close', 'high', 'low'}.issubset(df.columns):
+        key = _candle_set_key(df.index, df['close'].values, df['high'].values, df['low'].values)
+        cached = _indicator_cache.get(key) if key is not None else None
+        if cached is not None:
+            _indicator_cache.move_to_end(key)
+            return dict(cached)
+    
+    # Validates the frame before computing anything
+    indicators = get_latest_indicators(df)
+    if indicators and key is not None:
+        _indicator_cache[key] = indicators
+        if len(_indicator_cache) > INDICATOR_CACHE_SIZE:
+            _indicator_cache.popitem(last=False)
+        return dict(indicators)
+    return indicators
+
+
+def generate_signal(df: pd.DataFrame) -> SignalResult:
     """
     Generate trading signal based on technical indicators
     
@@ -20,81 +116,77 @@ def generate_signal(df: pd.DataFrame) -> Dict:
         df: DataFrame with OHLCV data
     
     Returns:
-        dict: Signal information with keys:
+        SignalResult: Signal information with fields:
             - signal: 'long' | 'flat'
             - sl: stop loss price
             - tp1: take profit 1 price
             - entry_ref_price: reference price for entry
+            - close ... ema_diff_pct: indicator values behind the decision
     """
     try:
-        # Validate input data
-        if not is_valid_data(df):
+        # Latest indicator values, shared with the other helpers for this bar;
+        # validation happens once per bar inside the cache
+        indicators = _latest_indicators(df)
+        if not indicators:
             logger.warning("Invalid data for signal generation")
-            return {
-                'signal': 'flat',
-                'sl': None,
-                'tp1': None,
-                'entry_ref_price': None
-            }
+            return FLAT_SIGNAL
         
-        # Calculate indicators
-        df_with_indicators = calculate_all_indicators(df)
+        return generate_signal_from_indicators(indicators)
         
-        # Get latest values
-        latest = df_with_indicators.iloc[-1]
-        
-        close = latest['close']
-        ema20 = latest['ema20']
-        ema50 = latest['ema50']
-        rsi = latest['rsi']
-        atr = latest['atr']
-        ema_diff_pct = latest['ema_diff_pct']
+    except Exception as e:
+        logger.error(f"Error generating signal: {e}")
+        return FLAT_SIGNAL
+
+
+def _signal_time(ts: Optional[datetime] = None) -> datetime:
+    """Time for the hour/weekday filters in SIGNAL_TZ; naive times are UTC (Binance open times)"""
+    if ts is None:
+        return datetime.now(SIGNAL_TZ)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(SIGNAL_TZ)
+
+
+def generate_signal_from_indicators(indicators: Dict, now: Optional[datetime] = None) -> SignalResult:
+    """
+    Generate trading signal from the latest indicator values
+    
+    Same rules as generate_signal(), for callers that maintain indicators
+    incrementally (see IndicatorState).
+    
+    Args:
+        indicators: dict with close, ema20, ema50, rsi, atr, ema_diff_pct
+        now: Time for the hour/weekday filters, read in SIGNAL_TZ (naive = UTC);
+            defaults to the wall clock
+    
+    Returns:
+        SignalResult: Signal information, as for generate_signal()
+    """
+    try:
+        close = indicators['close']
+        ema20 = indicators['ema20']
+        ema50 = indicators['ema50']
+        rsi = indicators['rsi']
+        atr = indicators['atr']
+        ema_diff_pct = indicators['ema_diff_pct']
         
         # Check for NaN values
-        if pd.isna(close) or pd.isna(ema20) or pd.isna(ema50) or pd.isna(rsi) or pd.isna(atr):
+        if math.isnan(close) or math.isnan(ema20) or math.isnan(ema50) or math.isnan(rsi) or math.isnan(atr):
             logger.warning("NaN values in indicators, cannot generate signal")
-            return {
-                'signal': 'flat',
-                'sl': None,
-                'tp1': None,
-                'entry_ref_price': None
-            }
-        
-        # ENHANCED: Entry conditions for long position with better timing
-        condition1 = close > ema20  # Close above EMA20
-        condition2 = ema20 > ema50  # EMA20 above EMA50 (uptrend)
-        condition3 = rsi > 50  # RSI above 50 (momentum)
-        
-        # NEW: Enhanced trend strength requirement (from loss analysis)
-        condition4 = ema_diff_pct >= 0.005  # Stronger trend (0.5% vs 0.3%)
-        
-        # NEW: Avoid overbought conditions (from loss analysis)
-        condition5 = rsi < 70  # RSI not overbought
+            return FLAT_SIGNAL
         
-        # NEW: Avoid oversold conditions
-        condition6 = rsi > 30  # RSI not oversold
-        
-        # NEW: Minimum volatility requirement
-        condition7 = atr >= close * 0.003  # ATR at least 0.3% of price
-        
-        # ENHANCED: Better chop detection
-        in_chop = (ema_diff_pct < 0.003) and (45 <= rsi <= 55)
-        not_in_chop = not in_chop
+        now = _signal_time(now)
         
-        # NEW: Time-based filter (avoid worst trading hours from loss analysis)
-        current_hour = pd.Timestamp.now().hour
-        avoid_hours = list(range(6, 12))  # 06:00-12:00 (worst performing)
-        good_timing = current_hour not in avoid_hours
-        
-        # NEW: Day-based filter (avoid Sunday trading from loss analysis)
-        current_day = pd.Timestamp.now().strftime('%A')
-        avoid_days = ['Sunday']  # Worst performing day
-        good_day = current_day not in avoid_days
-        
-        # All conditions must be met for long signal
-        long_signal = (condition1 and condition2 and condition3 and condition4 and 
-                      condition5 and condition6 and condition7 and not_in_chop and 
-                      good_timing and good_day)
+        # Entry conditions, most often failing first so the chain stops early. A
+        # trend of at least 0.5% also rules out chop (ema_diff_pct < 0.3%), and
+        # rsi > 50 covers the oversold filter.
+        long_signal = (ema_diff_pct >= 0.005  # Stronger trend (0.5% vs 0.3%)
+                       and ema20 > ema50  # EMA20 above EMA50 (uptrend)
+                       and close > ema20  # Close above EMA20
+                       and 50 < rsi < 70  # Momentum, not overbought
+                       and atr >= close * 0.003  # ATR at least 0.3% of price
+                       and not (AVOID_HOURS_MASK >> now.hour) & 1
+                       and not (AVOID_WEEKDAYS_MASK >> now.weekday()) & 1)
         
         if long_signal:
             # Calculate stop loss and take profit with new multiplier
@@ -106,74 +198,152 @@ def generate_signal(df: pd.DataFrame) -> Dict:
                 logger.warning("Stop loss would be negative, using 5% below close")
                 sl = close * 0.95
             
-            logger.info(f"LONG signal generated - Close: {close:.2f}, SL: {sl:.2f}, TP1: {tp1:.2f}")
-            logger.info(f"Signal quality: Trend strength {ema_diff_pct*100:.2f}%, RSI: {rsi:.1f}, ATR: {atr:.2f}")
+            logger.info("LONG signal generated - Close: %.2f, SL: %.2f, TP1: %.2f", close, sl, tp1)
+            logger.info("Signal quality: Trend strength %.2f%%, RSI: %.1f, ATR: %.2f", ema_diff_pct * 100, rsi, atr)
             
-            return {
-                'signal': 'long',
-                'sl': sl,
-                'tp1': tp1,
-                'entry_ref_price': close,
-                'indicators': {
-                    'close': close,
-                    'ema20': ema20,
-                    'ema50': ema50,
-                    'rsi': rsi,
-                    'atr': atr,
-                    'ema_diff_pct': ema_diff_pct,
-                    'signal_strength': min(ema_diff_pct * 1000, 100)  # 0-100 scale
-                }
-            }
+            return SignalResult('long', sl, tp1, close, close, ema20, ema50, rsi, atr, ema_diff_pct)
         else:
-            # Log why signal was not generated with enhanced details
+            # Explain the rejection only when someone will read it
             reasons = []
-            if not condition1:
-                reasons.append(f"close({close:.2f}) <= ema20({ema20:.2f})")
-            if not condition2:
-                reasons.append(f"ema20({ema20:.2f}) <= ema50({ema50:.2f})")
-            if not condition3:
-                reasons.append(f"rsi({rsi:.1f}) <= 50")
-            if not condition4:
-                reasons.append(f"weak_trend(ema_diff_pct={ema_diff_pct:.4f} < 0.005)")
-            if not condition5:
-                reasons.append(f"overbought(rsi={rsi:.1f} >= 70)")
-            if not condition6:
-                reasons.append(f"oversold(rsi={rsi:.1f} <= 30)")
-            if not condition7:
-                reasons.append(f"low_volatility(atr={atr:.2f}, {atr/close*100:.2f}% of price)")
-            if in_chop:
-                reasons.append(f"in_chop(ema_diff_pct={ema_diff_pct:.4f}, rsi={rsi:.1f})")
-            if not good_timing:
-                reasons.append(f"bad_timing(hour {current_hour} in avoid_hours {avoid_hours})")
-            if not good_day:
-                reasons.append(f"bad_day({current_day} in avoid_days {avoid_days})")
+            if logger.isEnabledFor(logging.DEBUG):
+                if not close > ema20:
+                    reasons.append(f"close({close:.2f}) <= ema20({ema20:.2f})")
+                if not ema20 > ema50:
+                    reasons.append(f"ema20({ema20:.2f}) <= ema50({ema50:.2f})")
+                if not rsi > 50:
+                    reasons.append(f"rsi({rsi:.1f}) <= 50")
+                if not ema_diff_pct >= 0.005:
+                    reasons.append(f"weak_trend(ema_diff_pct={ema_diff_pct:.4f} < 0.005)")
+                if not rsi < 70:
+                    reasons.append(f"overbought(rsi={rsi:.1f} >= 70)")
+                if not rsi > 30:
+                    reasons.append(f"oversold(rsi={rsi:.1f} <= 30)")
+                if not atr >= close * 0.003:
+                    reasons.append(f"low_volatility(atr={atr:.2f}, {atr/close*100:.2f}% of price)")
+                if ema_diff_pct < 0.003 and 45 <= rsi <= 55:
+                    reasons.append(f"in_chop(ema_diff_pct={ema_diff_pct:.4f}, rsi={rsi:.1f})")
+                if (AVOID_HOURS_MASK >> now.hour) & 1:
+                    reasons.append(f"bad_timing(hour {now.hour} in avoid_hours 06:00-12:00)")
+                if (AVOID_WEEKDAYS_MASK >> now.weekday()) & 1:
+                    reasons.append(f"bad_day({now.strftime('%A')} in avoid_days)")
+                
+                logger.debug("No long signal - reasons: %s", ', '.join(reasons))
             
-            logger.debug(f"No long signal - reasons: {', '.join(reasons)}")
-            
-            return {
-                'signal': 'flat',
-                'sl': None,
-                'tp1': None,
-                'entry_ref_price': None,
-                'indicators': {
-                    'close': close,
-                    'ema20': ema20,
-                    'ema50': ema50,
-                    'rsi': rsi,
-                    'atr': atr,
-                    'ema_diff_pct': ema_diff_pct,
-                    'rejected_reasons': reasons
-                }
-            }
+            return SignalResult('flat', None, None, None, close, ema20, ema50, rsi, atr, ema_diff_pct,
+                                tuple(reasons))
             
     except Exception as e:
         logger.error(f"Error generating signal: {e}")
-        return {
-            'signal': 'flat',
-            'sl': None,
-            'tp1': None,
-            'entry_ref_price': None
-        }
+        return FLAT_SIGNAL
+
+
+def generate_signal_streaming(state: IndicatorState, close: float, high: float, low: float,
+                              ts: Optional[datetime] = None) -> SignalResult:
+    """
+    Commit one closed candle to a running IndicatorState and generate its signal
+    
+    For live feeds that deliver one candle at a time: the indicators advance
+    by O(1) recurrences instead of recomputing over the whole history.
+    
+    Args:
+        state: IndicatorState holding every earlier candle (see IndicatorState.seed)
+        close: Candle close
+        high: Candle high
+        low: Candle low
+        ts: Candle timestamp for the hour/weekday filters, read in SIGNAL_TZ like
+            the other paths (naive = UTC); defaults to the wall clock
+    
+    Returns:
+        SignalResult: Signal information, as for generate_signal()
+    """
+    try:
+        indicators = state.update(close, high, low, ts)
+    except Exception as e:
+        logger.error(f"Error updating streaming indicators: {e}")
+        return FLAT_SIGNAL
+    return generate_signal_from_indicators(indicators, ts)
+
+
+def generate_signals_vectorized(df: pd.DataFrame,
+                                out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+                                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluate the generate_signal() entry rules on every bar at once, for backtests
+    
+    The hour and weekday filters use each bar's own timestamp (the index)
+    rather than the wall clock, converted to SIGNAL_TZ like the live path's
+    clock; a naive index is taken as UTC, as Binance open times are. Bars
+    without enough history for the indicators are flat.
+    
+    Args:
+        df: DataFrame with OHLCV data and a DatetimeIndex
+        out: Optional (bool, float64, float64) buffers of at least len(df) to
+            write into, so repeated backtest runs can reuse their allocations.
+            The returned arrays are views of these buffers.
+    
+    Returns:
+        tuple: (long_mask, sl, tp1) arrays of len(df); sl and tp1 are NaN
+            where there is no long signal
+    """
+    n = len(df)
+    if out is None:
+        long_mask, sl, tp1 = np.empty(n, dtype=bool), np.empty(n), np.empty(n)
+    else:
+        long_mask, sl, tp1 = out[0][:n], out[1][:n], out[2][:n]
+    try:
+        if not is_valid_data(df):
+            logger.warning("Invalid data for vectorized signal generation")
+            return _flat_signals(long_mask, sl, tp1)
+        
+        ind = calculate_all_indicators(df)
+        close = ind['close'].to_numpy(dtype=np.float64)
+        ema20 = ind['ema20'].to_numpy(dtype=np.float64)
+        ema50 = ind['ema50'].to_numpy(dtype=np.float64)
+        rsi = ind['rsi'].to_numpy(dtype=np.float64)
+        atr = ind['atr'].to_numpy(dtype=np.float64)
+        ema_diff_pct = ind['ema_diff_pct'].to_numpy(dtype=np.float64)
+        
+        # One bool and one float scratch array serve every intermediate step
+        hit = np.empty(n, dtype=bool)
+        tmp = np.empty(n)
+        
+        # Same rules as generate_signal_from_indicators(); NaN warm-up rows compare False
+        np.greater_equal(ema_diff_pct, 0.005, out=long_mask)
+        long_mask &= np.greater(ema20, ema50, out=hit)
+        long_mask &= np.greater(close, ema20, out=hit)
+        long_mask &= np.greater(rsi, 50, out=hit)
+        long_mask &= np.less(rsi, 70, out=hit)
+        long_mask &= np.greater_equal(atr, np.multiply(close, 0.003, out=tmp), out=hit)
+        
+        if isinstance(df.index, pd.DatetimeIndex):
+            index = df.index if df.index.tz is not None else df.index.tz_localize('UTC')
+            index = index.tz_convert(SIGNAL_TZ)
+            long_mask &= ((AVOID_HOURS_MASK >> index.hour.to_numpy()) & 1) == 0
+            long_mask &= ((AVOID_WEEKDAYS_MASK >> index.weekday.to_numpy()) & 1) == 0
+        
+        np.multiply(atr, -2.2, out=sl)
+        sl += close
+        np.copyto(sl, np.multiply(close, 0.95, out=tmp), where=np.less_equal(sl, 0, out=hit))  # Keep the stop positive
+        np.multiply(atr, 1.5, out=tp1)
+        tp1 += close
+        
+        np.logical_not(long_mask, out=hit)
+        np.copyto(sl, np.nan, where=hit)
+        np.copyto(tp1, np.nan, where=hit)
+        return long_mask, sl, tp1
+        
+    except Exception as e:
+        logger.error(f"Error generating vectorized signals: {e}")
+        return _flat_signals(long_mask, sl, tp1)
+
+
+def _flat_signals(long_mask: np.ndarray, sl: np.ndarray,
+                  tp1: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fill the vectorized result arrays with "no signal" in place"""
+    long_mask.fill(False)
+    sl.fill(np.nan)
+    tp1.fill(np.nan)
+    return long_mask, sl, tp1
 
 
 def analyze_market_conditions(df: pd.DataFrame) -> Dict:
@@ -187,10 +357,7 @@ def analyze_market_conditions(df: pd.DataFrame) -> Dict:
         dict: Market analysis
     """
     try:
-        if not is_valid_data(df):
-            return {}
-        
-        indicators = get_latest_indicators(df)
+        indicators = _latest_indicators(df)
         if not indicators:
             return {}
         
@@ -201,31 +368,10 @@ def analyze_market_conditions(df: pd.DataFrame) -> Dict:
         atr = indicators['atr']
         ema_diff_pct = indicators['ema_diff_pct']
         
-        # Determine trend
-        if ema20 > ema50:
-            trend = "uptrend"
-        elif ema20 < ema50:
-            trend = "downtrend"
-        else:
-            trend = "sideways"
-        
-        # Determine momentum
-        if rsi > 70:
-            momentum = "overbought"
-        elif rsi < 30:
-            momentum = "oversold"
-        elif rsi > 50:
-            momentum = "bullish"
-        else:
-            momentum = "bearish"
-        
-        # Determine volatility
-        if atr > close * 0.05:  # ATR > 5% of close
-            volatility = "high"
-        elif atr < close * 0.02:  # ATR < 2% of close
-            volatility = "low"
-        else:
-            volatility = "medium"
+        # Classify by table lookup; NaN fails every test and lands on index 0
+        trend = _TREND_LABELS[int(ema20 > ema50) - int(ema20 < ema50)]
+        momentum = _MOMENTUM_LABELS[int(rsi > 50) + int(rsi > 70) - int(rsi < 30)]
+        volatility = _VOLATILITY_LABELS[int(atr > close * 0.05) - int(atr < close * 0.02)]  # ATR vs 5% / 2% of close
         
         # Determine if in chop
         in_chop = (ema_diff_pct < 0.003) and (45 <= rsi <= 55)
@@ -243,54 +389,45 @@ def analyze_market_conditions(df: pd.DataFrame) -> Dict:
         return {}
 
 
-def validate_signal_quality(signal: Dict) -> bool:
+def validate_signal_quality(signal: SignalResult) -> bool:
     """
     Validate the quality of a generated signal
     
     Args:
-        signal: Signal dictionary from generate_signal()
+        signal: SignalResult from generate_signal()
     
     Returns:
         bool: True if signal quality is acceptable
     """
     try:
-        if signal['signal'] != 'long':
+        if signal.signal != 'long':
             return False
         
-        close = signal['entry_ref_price']
-        sl = signal['sl']
-        tp1 = signal['tp1']
+        close = signal.entry_ref_price
+        sl = signal.sl
+        tp1 = signal.tp1
         
         # Check if stop loss and take profit are reasonable
         if sl is None or tp1 is None or close is None:
             return False
         
-        # Stop loss should be below entry price
-        if sl >= close:
-            logger.warning("Stop loss is not below entry price")
-            return False
-        
-        # Take profit should be above entry price
-        if tp1 <= close:
-            logger.warning("Take profit is not above entry price")
-            return False
-        
-        # Risk-reward ratio should be reasonable (at least 1:1)
+        # One pass, no divisions: the stop distance is both the R:R denominator
+        # and the too-close check (R:R at least 0.8, stop at least 1% away)
         risk = close - sl
         reward = tp1 - close
-        rr_ratio = reward / risk if risk > 0 else 0
+        if risk > 0 and reward > 0 and reward >= 0.8 * risk and risk >= 0.01 * close:
+            return True
         
-        if rr_ratio < 0.8:  # Allow some flexibility
-            logger.warning(f"Risk-reward ratio too low: {rr_ratio:.2f}")
-            return False
-        
-        # Stop loss should not be too close (at least 1% away)
-        sl_distance_pct = (close - sl) / close
-        if sl_distance_pct < 0.01:
-            logger.warning(f"Stop loss too close: {sl_distance_pct:.3f}")
-            return False
-        
-        return True
+        # Rejected: report the first failing check
+        if not risk > 0:
+            logger.warning("Stop loss is not below entry price")
+        elif not reward > 0:
+            logger.warning("Take profit is not above entry price")
+        elif not reward >= 0.8 * risk:
+            logger.warning(f"Risk-reward ratio too low: {reward / risk:.2f}")
+        else:
+            logger.warning(f"Stop loss too close: {risk / close:.3f}")
+        return False
         
     except Exception as e:
         logger.error(f"Error validating signal quality: {e}")
@@ -302,7 +439,7 @@ def generate_basic_signal(df: pd.DataFrame) -> str:
     """Legacy basic signal generation"""
     try:
         signal = generate_signal(df)
-        return signal['signal']
+        return signal.signal
     except Exception as e:
         logger.error(f"Error in basic signal generation: {e}")
         return 'flat'
@@ -319,10 +456,7 @@ def get_signal_strength(df: pd.DataFrame) -> float:
         float: Signal strength (0-1)
     """
     try:
-        if not is_valid_data(df):
-            return 0.0
-        
-        indicators = get_latest_indicators(df)
+        indicators = _latest_indicators(df)
         if not indicators:
             return 0.0
         
@@ -332,20 +466,10 @@ def get_signal_strength(df: pd.DataFrame) -> float:
         rsi = indicators['rsi']
         ema_diff_pct = indicators['ema_diff_pct']
         
-        # Count conditions met
-        conditions_met = 0
-        total_conditions = 4
-        
-        if close > ema20:
-            conditions_met += 1
-        if ema20 > ema50:
-            conditions_met += 1
-        if rsi > 50:
-            conditions_met += 1
-        if not ((ema_diff_pct < 0.003) and (45 <= rsi <= 55)):
-            conditions_met += 1
-        
-        return conditions_met / total_conditions
+        # Count conditions met, out of 4; sum() starts from int 0, so NumPy bools count as 0/1
+        conditions_met = sum((close > ema20, ema20 > ema50, rsi > 50,
+                              not (ema_diff_pct < 0.003 and 45 <= rsi <= 55)))
+        return float(conditions_met) * 0.25
         
     except Exception as e:
         logger.error(f"Error calculating signal strength: {e}")